@@ -1,18 +1,116 @@
 
 import time
 from .lcdconfig import RaspberryPi
+from .pixelformat import RGB565, RGB444, COLMOD, PIXELS_PER_GROUP, frame_nbytes, rgb_to_rgb565, rgb_to_rgb444
+
+# MADCTL: BGR order as set by Init, MX mirrors the column scan direction
+MADCTL_BASE = 0x08
+MADCTL_MX = 0x40
+
+# GC9A01 power-on sequence: (command, parameter bytes, delay after it in ms)
+_INIT_SEQUENCE = (
+    (0xEF, b'', 0),
+    (0xEB, bytes((0x14,)), 0),
+    (0xFE, b'', 0),
+    (0xEF, b'', 0),
+    (0xEB, bytes((0x14,)), 0),
+    (0x84, bytes((0x40,)), 0),
+    (0x85, bytes((0xFF,)), 0),
+    (0x86, bytes((0xFF,)), 0),
+    (0x87, bytes((0xFF,)), 0),
+    (0x88, bytes((0x0A,)), 0),
+    (0x89, bytes((0x21,)), 0),
+    (0x8A, bytes((0x00,)), 0),
+    (0x8B, bytes((0x80,)), 0),
+    (0x8C, bytes((0x01,)), 0),
+    (0x8D, bytes((0x01,)), 0),
+    (0x8E, bytes((0xFF,)), 0),
+    (0x8F, bytes((0xFF,)), 0),
+    (0xB6, bytes((0x00, 0x20)), 0),
+    (0x36, bytes((MADCTL_BASE,)), 0),
+    (0x3A, bytes((0x05,)), 0),
+    (0x90, bytes((0x08, 0x08, 0x08, 0x08)), 0),
+    (0xBD, bytes((0x06,)), 0),
+    (0xBC, bytes((0x00,)), 0),
+    (0xFF, bytes((0x60, 0x01, 0x04)), 0),
+    (0xC3, bytes((0x13,)), 0),
+    (0xC4, bytes((0x13,)), 0),
+    (0xC9, bytes((0x22,)), 0),
+    (0xBE, bytes((0x11,)), 0),
+    (0xE1, bytes((0x10, 0x0E)), 0),
+    (0xDF, bytes((0x21, 0x0C, 0x02)), 0),
+    (0xF0, bytes((0x45, 0x09, 0x08, 0x08, 0x26, 0x2A)), 0),
+    (0xF1, bytes((0x43, 0x70, 0x72, 0x36, 0x37, 0x6F)), 0),
+    (0xF2, bytes((0x45, 0x09, 0x08, 0x08, 0x26, 0x2A)), 0),
+    (0xF3, bytes((0x43, 0x70, 0x72, 0x36, 0x37, 0x6F)), 0),
+    (0xED, bytes((0x1B, 0x0B)), 0),
+    (0xAE, bytes((0x77,)), 0),
+    (0xCD, bytes((0x63,)), 0),
+    (0x70, bytes((0x07, 0x07, 0x04, 0x0E, 0x0F, 0x09, 0x07, 0x08, 0x03)), 0),
+    (0xE8, bytes((0x34,)), 0),
+    (0x62, bytes((0x18, 0x0D, 0x71, 0xED, 0x70, 0x70, 0x18, 0x0F, 0x71, 0xEF, 0x70, 0x70)), 0),
+    (0x63, bytes((0x18, 0x11, 0x71, 0xF1, 0x70, 0x70, 0x18, 0x13, 0x71, 0xF3, 0x70, 0x70)), 0),
+    (0x64, bytes((0x28, 0x29, 0xF1, 0x01, 0xF1, 0x00, 0x07)), 0),
+    (0x66, bytes((0x3C, 0x00, 0xCD, 0x67, 0x45, 0x45, 0x10, 0x00, 0x00, 0x00)), 0),
+    (0x67, bytes((0x00, 0x3C, 0x00, 0x00, 0x00, 0x01, 0x54, 0x10, 0x32, 0x98)), 0),
+    (0x74, bytes((0x10, 0x85, 0x80, 0x00, 0x00, 0x4E, 0x00)), 0),
+    (0x98, bytes((0x3E, 0x07)), 0),
+    (0x35, b'', 0),
+    (0x21, b'', 0),
+    (0x11, b'', 120),
+    (0x29, b'', 20),
+)
 
 class LCD_1inch28(RaspberryPi):
 
     width = 240
     height = 240 
+    _clear_buffer = None
+    _windows = None
+    _madctl = None
+    _dc = None
+    # RGB565 или RGB444; COLMOD отправляется в Init
+    pixel_format = RGB565
+    # Панель, выбранная линиями выбора; None - все панели сразу
+    target = None
+
+    def _set_dc(self, level):
+        if self._dc != level:
+            self.digital_write(self.DC_PIN, level)
+            self._dc = level
+
     def command(self, cmd):
-        self.digital_write(self.DC_PIN, self.GPIO.LOW)
+        self._set_dc(self.GPIO.LOW)
         self.spi_writebyte([cmd])
         
     def data(self, val):
-        self.digital_write(self.DC_PIN, self.GPIO.HIGH)
+        self._set_dc(self.GPIO.HIGH)
         self.spi_writebyte([val])
+
+    def send_command(self, cmd, params=b''):
+        """Send a command and all of its parameter bytes in one data transaction"""
+        self._set_dc(self.GPIO.LOW)
+        self.spi_writebyte([cmd])
+        if params:
+            self._set_dc(self.GPIO.HIGH)
+            self.spi_writebuffer(params)
+
+    def _cached(self, cache, value):
+        """Check whether the current target is known to have value in a per-target cache"""
+        if self.target is None:
+            # Все панели сразу: значение должно совпадать у всех
+            return None in cache and all(v == value for v in cache.values())
+        # Значение для None получили все панели, пока его не переопределили
+        return cache.get(self.target, cache.get(None)) == value
+
+    def _remember(self, cache, value):
+        if self.target is None:
+            cache.clear()
+        cache[self.target] = value
+
+    def invalidate_window(self):
+        """Forget the cached address windows, e.g. after the panel was reset"""
+        self._windows = {}
         
     def reset(self):
         """Reset the display"""
@@ -27,258 +125,44 @@ class LCD_1inch28(RaspberryPi):
         """Initialize dispaly"""  
         self.module_init()   
         self.reset()
-        
-        self.command(0xEF)
-        self.command(0xEB)
-        self.data(0x14)
-        
-        self.command(0xFE)			 
-        self.command(0xEF) 
-
-        self.command(0xEB)	
-        self.data(0x14)
-
-        self.command(0x84)			
-        self.data(0x40) 
-
-        self.command(0x85)			
-        self.data(0xFF)
-
-        self.command(0x86)			
-        self.data(0xFF) 
-
-        self.command(0x87)		
-        self.data(0xFF)
-
-        self.command(0x88)			
-        self.data(0x0A)
-
-        self.command(0x89)			
-        self.data(0x21)
-
-        self.command(0x8A)		
-        self.data(0x00)
-
-        self.command(0x8B)			
-        self.data(0x80) 
-
-        self.command(0x8C)			
-        self.data(0x01) 
-
-        self.command(0x8D)			
-        self.data(0x01) 
-
-        self.command(0x8E)			
-        self.data(0xFF) 
-
-        self.command(0x8F)			
-        self.data(0xFF) 
-
-
-        self.command(0xB6)
-        self.data(0x00)
-        self.data(0x20)
-
-        self.command(0x36)
-        self.data(0x08)
-    
-        self.command(0x3A)			
-        self.data(0x05) 
-
-
-        self.command(0x90)			
-        self.data(0x08)
-        self.data(0x08)
-        self.data(0x08)
-        self.data(0x08) 
-
-        self.command(0xBD)			
-        self.data(0x06)
-	
-        self.command(0xBC)			
-        self.data(0x00)	
-
-        self.command(0xFF)			
-        self.data(0x60)
-        self.data(0x01)
-        self.data(0x04)
-
-        self.command(0xC3)			
-        self.data(0x13)
-        self.command(0xC4)			
-        self.data(0x13)
-
-        self.command(0xC9)		
-        self.data(0x22)
-
-        self.command(0xBE)			
-        self.data(0x11)
-
-        self.command(0xE1)		
-        self.data(0x10)
-        self.data(0x0E)
-
-        self.command(0xDF)			
-        self.data(0x21)
-        self.data(0x0c)
-        self.data(0x02)
-
-        self.command(0xF0)   
-        self.data(0x45)
-        self.data(0x09)
-        self.data(0x08)
-        self.data(0x08)
-        self.data(0x26)
-        self.data(0x2A)
-
-        self.command(0xF1)    
-        self.data(0x43)
-        self.data(0x70)
-        self.data(0x72)
-        self.data(0x36)
-        self.data(0x37)  
-        self.data(0x6F)
-
-
-        self.command(0xF2)   
-        self.data(0x45)
-        self.data(0x09)
-        self.data(0x08)
-        self.data(0x08)
-        self.data(0x26)
-        self.data(0x2A)
-
-        self.command(0xF3)  
-        self.data(0x43)
-        self.data(0x70)
-        self.data(0x72)
-        self.data(0x36)
-        self.data(0x37) 
-        self.data(0x6F)
-
-        self.command(0xED)	
-        self.data(0x1B) 
-        self.data(0x0B) 
-
-        self.command(0xAE)			
-        self.data(0x77)
-	
-        self.command(0xCD)			
-        self.data(0x63)		
-
-
-        self.command(0x70)			
-        self.data(0x07)
-        self.data(0x07)
-        self.data(0x04)
-        self.data(0x0E) 
-        self.data(0x0F)
-        self.data(0x09)
-        self.data(0x07)
-        self.data(0x08)
-        self.data(0x03)
-
-        self.command(0xE8)			
-        self.data(0x34)
-
-        self.command(0x62)			
-        self.data(0x18)
-        self.data(0x0D)
-        self.data(0x71)
-        self.data(0xED)
-        self.data(0x70)
-        self.data(0x70)
-        self.data(0x18)
-        self.data(0x0F)
-        self.data(0x71)
-        self.data(0xEF)
-        self.data(0x70) 
-        self.data(0x70)
-
-        self.command(0x63)			
-        self.data(0x18)
-        self.data(0x11)
-        self.data(0x71)
-        self.data(0xF1)
-        self.data(0x70) 
-        self.data(0x70)
-        self.data(0x18)
-        self.data(0x13)
-        self.data(0x71)
-        self.data(0xF3)
-        self.data(0x70) 
-        self.data(0x70)
-
-        self.command(0x64)			
-        self.data(0x28)
-        self.data(0x29)
-        self.data(0xF1)
-        self.data(0x01)
-        self.data(0xF1)
-        self.data(0x00)
-        self.data(0x07)
-
-        self.command(0x66)			
-        self.data(0x3C)
-        self.data(0x00)
-        self.data(0xCD)
-        self.data(0x67)
-        self.data(0x45)
-        self.data(0x45)
-        self.data(0x10)
-        self.data(0x00)
-        self.data(0x00)
-        self.data(0x00)
-
-        self.command(0x67)			
-        self.data(0x00)
-        self.data(0x3C)
-        self.data(0x00)
-        self.data(0x00)
-        self.data(0x00)
-        self.data(0x01)
-        self.data(0x54)
-        self.data(0x10)
-        self.data(0x32)
-        self.data(0x98)
-
-        self.command(0x74)			
-        self.data(0x10)	
-        self.data(0x85)	
-        self.data(0x80)
-        self.data(0x00) 
-        self.data(0x00)
-        self.data(0x4E)
-        self.data(0x00)					
-        
-        self.command(0x98)		
-        self.data(0x3e)
-        self.data(0x07)
-
-        self.command(0x35)	
-        self.command(0x21)
-
-        self.command(0x11)
-        time.sleep(0.12)
-        self.command(0x29)
-        time.sleep(0.02)
+        self._dc = None
+        self.invalidate_window()
+
+        for cmd, params, delay in _INIT_SEQUENCE:
+            if cmd == 0x3A:
+                params = bytes((COLMOD[self.pixel_format],))
+            self.send_command(cmd, params)
+            if delay:
+                self.delay_ms(delay)
+        self._madctl = {self.target: MADCTL_BASE}
+
+    def SetPixelFormat(self, pixel_format):
+        """Switch the current target to RGB565 or RGB444 with COLMOD"""
+        self.send_command(0x3A, bytes((COLMOD[pixel_format],)))
+        self.pixel_format = pixel_format
+
+    def SetMirror(self, mirrored):
+        """Mirror the current target horizontally via MADCTL; skipped if it is already set that way"""
+        madctl = MADCTL_BASE | MADCTL_MX if mirrored else MADCTL_BASE
+        if self._madctl is None:
+            self._madctl = {}
+        if not self._cached(self._madctl, madctl):
+            self.send_command(0x36, bytes((madctl,)))
+            self._remember(self._madctl, madctl)
   
     def SetWindows(self, Xstart, Ystart, Xend, Yend):
-        #set the X coordinates
-        self.command(0x2A)
-        self.data(0x00)               #Set the horizontal starting point to the high octet
-        self.data(Xstart)      #Set the horizontal starting point to the low octet
-        self.data(0x00)               #Set the horizontal end to the high octet
-        self.data(Xend - 1) #Set the horizontal end to the low octet 
-        
-        #set the Y coordinates
-        self.command(0x2B)
-        self.data(0x00)
-        self.data(Ystart)
-        self.data(0x00)
-        self.data(Yend - 1)
-
-        self.command(0x2C) 
+        """Set the address window; CASET/RASET are skipped if the window of the current target is unchanged"""
+        window = (Xstart, Ystart, Xend, Yend)
+        if self._windows is None:
+            self.invalidate_window()
+        if not self._cached(self._windows, window):
+            #set the X coordinates
+            self.send_command(0x2A, bytes((Xstart >> 8, Xstart & 0xFF, (Xend - 1) >> 8, (Xend - 1) & 0xFF)))
+            #set the Y coordinates
+            self.send_command(0x2B, bytes((Ystart >> 8, Ystart & 0xFF, (Yend - 1) >> 8, (Yend - 1) & 0xFF)))
+            self._remember(self._windows, window)
+
+        self.send_command(0x2C)
         
     def ShowImage(self,Image):
         """Set buffer to value of Python Imaging Library image."""
@@ -287,22 +171,41 @@ class LCD_1inch28(RaspberryPi):
         if imwidth != self.width or imheight != self.height:
             raise ValueError('Image must be same dimensions as display \
                 ({0}x{1}).' .format(self.width, self.height))
-        img = self.np.asarray(Image)
-        pix = self.np.zeros((self.width,self.height,2), dtype = self.np.uint8)
-        pix[...,[0]] = self.np.add(self.np.bitwise_and(img[...,[0]],0xF8),self.np.right_shift(img[...,[1]],5))
-        pix[...,[1]] = self.np.add(self.np.bitwise_and(self.np.left_shift(img[...,[1]],3),0xE0),self.np.right_shift(img[...,[2]],3))
-        pix = pix.flatten().tolist()
+        if Image.mode != 'RGB':
+            Image = Image.convert('RGB')
+        if self.pixel_format == RGB444:
+            self.ShowBuffer(rgb_to_rgb444(self.np.asarray(Image)))
+        else:
+            self.ShowBuffer(rgb_to_rgb565(self.np.asarray(Image)))
+
+    def ShowBuffer(self, buffer):
+        """Write a pre-encoded frame buffer in the panel pixel format to physical display"""
+        buffer = memoryview(buffer).cast('B')
+        if len(buffer) != frame_nbytes(self.pixel_format, self.width, self.height):
+            raise ValueError('Buffer must be same size as display \
+                ({0}x{1} {2}).' .format(self.width, self.height, self.pixel_format))
         self.SetWindows ( 0, 0, self.width, self.height)
-        self.digital_write(self.DC_PIN,self.GPIO.HIGH)
-        for i in range(0,len(pix),4096):
-            self.spi_writebyte(pix[i:i+4096])		
+        self._set_dc(self.GPIO.HIGH)
+        self.spi_writebuffer(buffer)
+
+    def ShowRegion(self, buffer, Xstart, Ystart, Xend, Yend):
+        """Write one rectangle of a full-frame buffer to physical display"""
+        group = PIXELS_PER_GROUP[self.pixel_format]
+        if Xstart % group or Xend % group:
+            raise ValueError('{0} regions must start and end on a multiple of {1} pixels.' \
+                .format(self.pixel_format, group))
+        row = frame_nbytes(self.pixel_format, self.width, 1)
+        pix = self.np.frombuffer(buffer, dtype = self.np.uint8).reshape(self.height, row)
+        pix = self.np.ascontiguousarray(pix[Ystart:Yend, Xstart * row // self.width:Xend * row // self.width])
+        self.SetWindows ( Xstart, Ystart, Xend, Yend)
+        self._set_dc(self.GPIO.HIGH)
+        self.spi_writebuffer(pix)
     
     def clear(self):
         """Clear contents of image buffer"""
-        _buffer = [0xff]*(self.width * self.height * 2)
+        size = frame_nbytes(self.pixel_format, self.width, self.height)
+        if self._clear_buffer is None or len(self._clear_buffer) != size:
+            self._clear_buffer = b'\xff' * size
         self.SetWindows ( 0, 0, self.width, self.height)
-        self.digital_write(self.DC_PIN,self.GPIO.HIGH)
-        for i in range(0,len(_buffer),4096):
-            self.spi_writebyte(_buffer[i:i+4096])	        
-        
-
+        self._set_dc(self.GPIO.HIGH)
+        self.spi_writebuffer(self._clear_buffer)
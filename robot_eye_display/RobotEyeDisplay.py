@@ -8,10 +8,38 @@ import logging
 import random
 import math
 import threading
+import itertools
+import functools
+import contextlib
+import hashlib
 from PIL import Image, ImageDraw, ImageFont, ImageSequence
-import RPi.GPIO as GPIO
-import spidev as SPI
+try:
+    import RPi.GPIO as GPIO
+    import spidev as SPI
+except ImportError:
+    # Не Raspberry Pi: передайте gpio= и spi= явно (см. simulator.py)
+    GPIO = None
+    SPI = None
 from .LCD_1inch28 import LCD_1inch28
+from .animation import EyeAnimation, DEFAULT_FRAME_DURATION, iter_gif
+from . import assetfile
+from .dirtyrect import FrameDiff
+from .pixelformat import RGB565, RGB444, BYTES_PER_PIXEL, PIXELS_PER_GROUP, frame_nbytes, encode, rgb565_to_rgb444
+from .scheduler import FrameScheduler
+from .metrics import DisplayMetrics
+from .pipeline import FramePipeline
+from .equalizer import EqualizerRenderer
+from .renderthread import RenderThread
+from .timer import DeadlineTimer
+
+
+def _exclusive_playback(method):
+    """Run a RobotEyeDisplay playback method with the panels to itself (see RobotEyeDisplay._playback)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._playback():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class EqualizerBar:
@@ -175,9 +203,15 @@ class EqualizerBar:
 
 
 class EqualizerLCDWindow:
-    def __init__(self, disp):
+    def __init__(self, disp, show_frame=None, full_rate=False, broadcast=True):
         # Store display
         self.disp = disp
+        # Функция вывода кадра на глаз (например, RobotEyeDisplay.show_frame)
+        self.show_frame = show_frame
+        # Полная частота: каждый кадр сразу на оба глаза, без чередования по 100 мс
+        self.full_rate = full_rate
+        # Один кадр на оба глаза одной передачей (оба сигнала выбора сняты, как при Init)
+        self.broadcast = broadcast
 
         # Store display dimensions
         self.width = self.disp.width  # 240
@@ -185,6 +219,8 @@ class EqualizerLCDWindow:
 
         # Создаем один эквалайзер для обоих глаз (одинаковая картинка)
         self.equalizer = EqualizerBar(10, color_scheme_index=0)
+        # Векторный рендерер сразу в RGB565, без PIL
+        self.renderer = EqualizerRenderer(self.width, self.height)
 
         # Инициализация с случайными значениями
         self.equalizer.setValues([random.randint(20, 80) for _ in range(10)])
@@ -231,18 +267,34 @@ class EqualizerLCDWindow:
 
         return image
 
+    def create_buffer(self):
+        """Создает новый кадр эквалайзера сразу в RGB565 (буфер переиспользуется)"""
+        self.update_values()
+        return self.renderer.render(self.equalizer)
+
     def show_eye(self, eye_side, frame):
         """Показывает кадр на указанном глазу"""
+        if self.show_frame is not None:
+            self.show_frame(eye_side, frame)
+            return
+
         # Управляем GPIO для выбора глаза
-        if eye_side == "left":
-            GPIO.output(7, 1)  # Включаем левый глаз
-            GPIO.output(24, 0)  # Выключаем правый глаз
+        self.disp.target = None if eye_side == "both" else eye_side
+        if eye_side == "both":
+            self.disp.GPIO.output(7, 0)  # Оба глаза принимают один и тот же кадр, как при Init
+            self.disp.GPIO.output(24, 0)
+        elif eye_side == "left":
+            self.disp.GPIO.output(7, 1)  # Включаем левый глаз
+            self.disp.GPIO.output(24, 0)  # Выключаем правый глаз
         else:  # right
-            GPIO.output(7, 0)  # Выключаем левый глаз
-            GPIO.output(24, 1)  # Включаем правый глаз
+            self.disp.GPIO.output(7, 0)  # Выключаем левый глаз
+            self.disp.GPIO.output(24, 1)  # Включаем правый глаз
 
         # Отображаем кадр на LCD
-        self.disp.ShowImage(frame)
+        if isinstance(frame, Image.Image):
+            self.disp.ShowImage(frame)
+        else:
+            self.disp.ShowBuffer(frame)
 
     def update_display(self, elapsed_time):
         """
@@ -251,6 +303,16 @@ class EqualizerLCDWindow:
         Args:
             elapsed_time: Время с последнего обновления в секундах
         """
+        if self.full_rate:
+            # Новый кадр на каждом обновлении, сразу на оба глаза
+            self.current_frame = self.create_buffer()
+            if self.broadcast:
+                self.show_eye("both", self.current_frame)
+            else:
+                self.show_eye("right", self.current_frame)
+                self.show_eye("left", self.current_frame)
+            return
+
         self.time_since_last_switch += elapsed_time
 
         # Если пришло время переключить глаз
@@ -260,12 +322,15 @@ class EqualizerLCDWindow:
             # Если это первый показ кадра или кадр уже показан обоим глазам
             if self.current_frame is None or self.frame_shown_count >= self.eyes_per_frame:
                 # Создаем новый кадр
-                self.current_frame = self.create_frame()
+                self.current_frame = self.create_buffer()
                 self.frame_shown_count = 0
                 self.current_eye = "right"  # Начинаем с правого глаза
 
-            # Показываем текущий кадр на текущем глазу
-            self.show_eye(self.current_eye, self.current_frame)
+            # Показываем текущий кадр на текущем глазу (или сразу на обоих, одной передачей)
+            if not self.broadcast:
+                self.show_eye(self.current_eye, self.current_frame)
+            elif self.frame_shown_count == 0:
+                self.show_eye("both", self.current_frame)
 
             # Увеличиваем счетчик показа кадра
             self.frame_shown_count += 1
@@ -281,62 +346,89 @@ class EqualizerAPI:
     def __init__(self, robot_eye_display):
         self._running = False
         self._thread = None
+        self._command = None
         self._lcd_window = None
         self.robot_display = robot_eye_display
         self.original_gpio_state = None
 
-    def play(self):
-        """Запускает визуализацию эквалайзера на LCD дисплее с поочередным включением глаз"""
-        if self._running:
+    def play(self, full_rate=False):
+        """
+        Запускает визуализацию эквалайзера на LCD дисплее с поочередным включением глаз
+
+        Args:
+            full_rate: Показывать каждый кадр сразу на обоих глазах, без чередования
+        """
+        if self.is_playing():
             return False
 
+        # С потоком рендера эквалайзер - обычная команда в его очереди
+        render_thread = self.robot_display.render_thread
+        if render_thread is not None:
+            self._command = render_thread.play_equalizer(full_rate)
+            self.robot_display.log.info("Equalizer visualization queued on the render thread")
+            return True
+
         self._running = True
 
         # Сохраняем оригинальное состояние GPIO
-        self.original_gpio_state = (GPIO.input(7), GPIO.input(24))
+        self.original_gpio_state = (self.robot_display.GPIO.input(7), self.robot_display.GPIO.input(24))
+        # Остановки, запрошенные до этого вызова, к эквалайзеру не относятся
+        stops = self.robot_display.timer.stops
 
         def run_visualization():
             try:
                 # Initialize LCD window with existing display
-                self._lcd_window = EqualizerLCDWindow(self.robot_display.disp)
+                self._lcd_window = EqualizerLCDWindow(self.robot_display.disp, self.robot_display.show_frame,
+                                                      full_rate)
 
                 # Main loop
-                last_update = time.time()
+                timer = self.robot_display.timer
+                last_update = timer.clock()
                 update_interval = 0.05  # 20 раз в секунду для плавного переключения глаз
 
-                while self._running:
-                    current_time = time.time()
-                    elapsed_time = current_time - last_update
-
-                    if elapsed_time >= update_interval:
-                        self._lcd_window.update_display(elapsed_time)
+                while self._running and not timer.is_set():
+                    # Спим до следующего кадра; stop() будит таймер сразу, без опроса часов
+                    if timer.wait_until(last_update + update_interval):
+                        current_time = timer.clock()
+                        self._lcd_window.update_display(current_time - last_update)
                         last_update = current_time
 
-                    # Небольшая задержка для снижения нагрузки на CPU
-                    time.sleep(0.001)
-
             except Exception as e:
                 self.robot_display.log.error(f"Error in equalizer visualization: {e}")
             finally:
                 # Cleanup - возвращаем оригинальное состояние GPIO
                 if self.original_gpio_state:
-                    GPIO.output(7, self.original_gpio_state[0])
-                    GPIO.output(24, self.original_gpio_state[1])
+                    self.robot_display.GPIO.output(7, self.original_gpio_state[0])
+                    self.robot_display.GPIO.output(24, self.original_gpio_state[1])
                 self._lcd_window = None
                 self.original_gpio_state = None
+                self._running = False
+
+        def run_exclusive():
+            # Ждём окончания текущего воспроизведения, чтобы не вести шину вдвоём
+            with self.robot_display._playback(stops):
+                run_visualization()
 
         # Запускаем в отдельном потоке
-        self._thread = threading.Thread(target=run_visualization, daemon=True)
+        self._thread = threading.Thread(target=run_exclusive, daemon=True)
         self._thread.start()
         self.robot_display.log.info("Equalizer visualization started with alternating eyes")
         return True
 
     def stop(self):
         """Останавливает визуализацию эквалайзера"""
+        if self._command is not None:
+            command, self._command = self._command, None
+            command.cancel()
+            command.wait(timeout=2)
+            self.robot_display.log.info("Equalizer visualization stopped")
+            return True
+
         if not self._running:
             return False
 
         self._running = False
+        self.robot_display.timer.wake()
 
         # Ждем завершения потока
         if self._thread and self._thread.is_alive():
@@ -344,33 +436,63 @@ class EqualizerAPI:
             self._thread = None
 
         # Возвращаем GPIO в исходное состояние
-        GPIO.output(7, 0)
-        GPIO.output(24, 0)
+        self.robot_display.GPIO.output(7, 0)
+        self.robot_display.GPIO.output(24, 0)
 
         self.robot_display.log.info("Equalizer visualization stopped")
         return True
 
     def is_playing(self):
         """Проверяет, запущена ли визуализация"""
+        if self._command is not None:
+            return not self._command.done.is_set()
         return self._running
 
 
 class RobotEyeDisplay:
-    def __init__(self):
-        global thread_status
-        thread_status = False
+    def __init__(self, partial_updates=False, gpio=None, spi=None, lead_in=2.0, hold=3.0, pipelined=False,
+                 skip_duplicates=True, spi_freq=40000000, chunk_size=None, pixel_format=RGB565):
         """
         Initialize the RobotEyeDisplay class.
 
         This class controls the robotic eye display on a Raspberry Pi.
+
+        Args:
+            partial_updates (bool): Send only the regions that changed since the
+                last frame shown on each eye instead of full frames.
+            gpio: GPIO module to use instead of RPi.GPIO, e.g. SimulatedBus.gpio.
+            spi: SPI device to use instead of spidev.SpiDev(0, 0).
+            lead_in (float): Pause in seconds before each animation.
+            hold (float): Extra pause in seconds after the last frame's own duration.
+            pipelined (bool): Prepare the next frame for both eyes on a worker thread
+                while the current one is being sent.
+            skip_duplicates (bool): Do not send a frame that is identical to the one
+                the eye already shows.
+            spi_freq (int): SPI clock in Hz.
+            chunk_size (int): Bytes per SPI write call; None sends a frame in one
+                writebytes2 call, or in spidev bufsiz pieces without writebytes2.
+                See calibrate_spi.
+            pixel_format (str): RGB565, or RGB444 to send 12-bit color, 25% fewer
+                bytes per frame. RGB565 buffers are converted on the way.
         """
+        self.GPIO = gpio if gpio is not None else GPIO
+        self._spi = spi
+        # Общий таймер кадров; его stop() прерывает воспроизведение на границе кадров
+        self.timer = DeadlineTimer()
+        # Одно воспроизведение за раз (см. _playback)
+        self._playback_lock = threading.RLock()
+        self._playback_depth = 0
+        self.render_thread = None
+        self.spi_freq = spi_freq
+        self.chunk_size = chunk_size
+        self.pixel_format = pixel_format
         # GPIO Setup
-        GPIO.setwarnings(False)
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(7, GPIO.OUT)
-        GPIO.setup(24, GPIO.OUT)
-        GPIO.output(7, 0)
-        GPIO.output(24, 0)
+        self.GPIO.setwarnings(False)
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(7, self.GPIO.OUT)
+        self.GPIO.setup(24, self.GPIO.OUT)
+        self.GPIO.output(7, 0)
+        self.GPIO.output(24, 0)
 
         # LCD Configuration
         self.RST = 27
@@ -381,6 +503,40 @@ class RobotEyeDisplay:
         self.log = logging.getLogger(__name__)
         self.disp = self.init_display()
 
+        # Последний отправленный кадр каждого глаза для частичного обновления
+        self.partial_updates = partial_updates
+        self._frame_diffs = {
+            "right": self._new_frame_diff(),
+            "left": self._new_frame_diff(),
+        }
+
+        # Глаз, который панель отражает по горизонтали (EyeAnimation.mirrored)
+        self.mirrored = {"right": False, "left": False}
+
+        # Пропуск кадров, совпадающих с уже показанным на глазу
+        self.skip_duplicates = skip_duplicates
+        self._last_sent = {"right": (None, None), "left": (None, None)}
+        self.skipped = {"right": {"frames": 0, "bytes": 0}, "left": {"frames": 0, "bytes": 0}}
+
+        # Счётчики и гистограммы по каждому глазу (см. metrics.DisplayMetrics)
+        self.metrics = DisplayMetrics(cpu=self.timer.cpu_per_second)
+
+        # Воспроизведение кадров по длительностям из GIF
+        self.scheduler = FrameScheduler()
+        self.scheduler.on_drop = self._on_drop
+        self.scheduler.on_overrun = self._on_overrun
+        self.lead_in = lead_in
+        self.hold = hold
+        self.pipelined = pipelined
+        self.pipeline_depth = 2
+        self.stream_lookahead = 2
+
+        # Библиотека эмоций для play_emotion (см. library.EmotionLibrary)
+        self.library = None
+
+        # Переходы между анимациями в play_animations (см. transition.TransitionCache)
+        self.transitions = None
+
         # Инициализируем Equalizer API
         self.equalizer_api = EqualizerAPI(self)
 
@@ -397,17 +553,99 @@ class RobotEyeDisplay:
         """
         try:
             self.log.info("Initializing display...")
-            disp = LCD_1inch28(spi=SPI.SpiDev(self.bus, self.device))
+            spi = self._spi if self._spi is not None else SPI.SpiDev(self.bus, self.device)
+            disp = LCD_1inch28(spi=spi, gpio=self.GPIO, spi_freq=self.spi_freq, chunk_size=self.chunk_size)
+            disp.pixel_format = self.pixel_format
             disp.Init()
             disp.clear()
-            GPIO.output(7, 0)
-            GPIO.output(24, 0)
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 0)
             self.log.info("Display initialized successfully.")
             return disp
         except Exception as e:
             self.log.error(f"Error initializing display: {e}")
             sys.exit(1)
 
+    def configure_spi(self, spi_freq=None, chunk_size=None):
+        """
+        Change the SPI clock and/or the chunk size; None keeps the current value.
+
+        Args:
+            spi_freq (int): SPI clock in Hz.
+            chunk_size (int): Bytes per SPI write call.
+        """
+        if spi_freq is not None:
+            self.spi_freq = spi_freq
+            self.disp.set_spi_speed(spi_freq)
+        if chunk_size is not None:
+            self.chunk_size = self.disp.chunk_size = chunk_size
+
+    def calibrate_spi(self, chunk_sizes=None, frames=4):
+        """
+        Measure SPI throughput for several chunk sizes and keep the fastest.
+
+        Black frames are sent to both eyes while measuring. A chunk size the
+        driver rejects (e.g. above the spidev bufsiz) is unsafe and is skipped.
+
+        Args:
+            chunk_sizes (list): Candidate sizes in bytes; defaults to powers of two
+                from 4096 up to one frame, capped at the spidev bufsiz when the
+                SPI device has no writebytes2.
+            frames (int): Full frames sent per candidate.
+
+        Returns:
+            dict: Chunk size -> bytes per second, None for sizes that failed.
+        """
+        disp = self.disp
+        frame = bytes(frame_nbytes(self.pixel_format, disp.width, disp.height))
+        if chunk_sizes is None:
+            limit = len(frame) if hasattr(disp.SPI, 'writebytes2') else disp.spi_bufsiz
+            candidates = {4096 << i for i in range(5)} | {len(frame), disp.spi_bufsiz}
+            chunk_sizes = sorted(size for size in candidates if size <= limit)
+
+        results = {}
+        self.select_eye("both")
+        for size in chunk_sizes:
+            disp.chunk_size = size
+            try:
+                start = time.perf_counter()
+                for _ in range(frames):
+                    disp.ShowBuffer(frame)
+                results[size] = frames * len(frame) / (time.perf_counter() - start)
+            except (OverflowError, OSError) as e:
+                self.log.warning(f"SPI chunk size {size} failed: {e}")
+                results[size] = None
+
+        measured = {size: rate for size, rate in results.items() if rate}
+        if measured:
+            self.chunk_size = max(measured, key=measured.get)
+            self.log.info(f"SPI chunk size set to {self.chunk_size} bytes "
+                          f"({measured[self.chunk_size] / 1e6:.2f} MB/s)")
+        disp.chunk_size = self.chunk_size
+        self.invalidate_eye()
+        self.GPIO.output(7, 0)
+        self.GPIO.output(24, 0)
+        return results
+
+    def set_pixel_format(self, pixel_format):
+        """
+        Switch both panels to another pixel format (COLMOD).
+
+        Both eyes are redrawn in full on their next frame. RGB565 frames keep
+        working in RGB444 mode (they are converted while they play); RGB444
+        animations must be reloaded after switching back to RGB565.
+
+        Args:
+            pixel_format (str): RGB565 or RGB444.
+        """
+        if pixel_format == self.pixel_format:
+            return
+        self.pixel_format = pixel_format
+        self.select_eye("both")
+        self.disp.SetPixelFormat(pixel_format)
+        self._frame_diffs = {"right": self._new_frame_diff(), "left": self._new_frame_diff()}
+        self.invalidate_eye()
+
     def load_frames(self, gif_path):
         """
         Load frames from a GIF.
@@ -422,96 +660,577 @@ class RobotEyeDisplay:
         frames = [frame.copy() for frame in ImageSequence.Iterator(gif)]
         return frames
 
+    def load_animation(self, gif_path):
+        """
+        Load a GIF and pre-encode its frames for the display.
+
+        Compiled .reye files (see robot_eye_display.compiler) are memory-mapped
+        instead, with no decoding at all.
+
+        Args:
+            gif_path (str): Path to the GIF or .reye file.
+
+        Returns:
+            EyeAnimation: Animation with panel-ready frame buffers.
+        """
+        if assetfile.is_compiled(gif_path):
+            return assetfile.load_animation(gif_path).convert(self.pixel_format)
+        return EyeAnimation.from_gif(gif_path, self.disp.width, self.disp.height, self.pixel_format)
+
+    def stream_animation(self, gif_path):
+        """
+        Decode a GIF on demand on a worker thread.
+
+        At most stream_lookahead frames are decoded ahead of playback, so the
+        first frame is ready almost immediately and memory stays flat however
+        long the GIF is. Compiled .reye files are memory-mapped instead.
+
+        Args:
+            gif_path (str): Path to the GIF or .reye file.
+
+        Returns:
+            FramePipeline: Iterable of (frame buffer, duration in ms); close it when done.
+        """
+        if assetfile.is_compiled(gif_path):
+            animation = assetfile.load_animation(gif_path)
+            frames = zip(animation.frames, animation.durations)
+        else:
+            frames = iter_gif(gif_path, self.disp.width, self.disp.height, self.pixel_format)
+        return FramePipeline(None, frames, self.stream_lookahead)
+
+    def display_stream(self, stream_R, stream_L):
+        """
+        Display streamed frames on the robotic eyes.
+
+        Args:
+            stream_R (iterable): (frame, duration in ms) pairs for the right eye.
+            stream_L (iterable): (frame, duration in ms) pairs for the left eye.
+        """
+        try:
+            self.timer.wait(self.lead_in)
+            self.set_mirror("right", False)
+            self.set_mirror("left", False)
+            pairs = itertools.zip_longest(stream_R, stream_L, fillvalue=(None, 0))
+            frames = (((frame_R, frame_L), max(duration_R, duration_L))
+                      for (frame_R, duration_R), (frame_L, duration_L) in pairs)
+            self.scheduler.play(frames, lambda pair: self.show_eyes(*pair), stop=self.timer)
+
+            self.timer.wait(self.hold)
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 0)
+
+            self.log.info("Display closed.")
+        except Exception as e:
+            self.log.error(f"Error displaying frames: {e}")
+
     def display_frames(self, frames_R, frames_L):
         """
         Display frames on the robotic eyes.
 
+        Frames are shown at the timestamps given by their durations; frames
+        that fall behind schedule are dropped (see RobotEyeDisplay.scheduler).
+        Mirrored animations (EyeAnimation.mirror) are mirrored by the panel.
+
         Args:
-            frames_R (list): List of frames for the right eye.
-            frames_L (list): List of frames for the left eye.
+            frames_R (list | EyeAnimation): Frames for the right eye.
+            frames_L (list | EyeAnimation): Frames for the left eye.
         """
         try:
-            time.sleep(2.0)
+            self.timer.wait(self.lead_in)
+            self.apply_mirrors(frames_R, frames_L)
             max_frames = max(len(frames_L), len(frames_R))
 
-            for i in range(max_frames):
-                if thread_status:
-                    break
-                if i < len(frames_L):
-                    self.left_eye(frames_L[i])
-                if i < len(frames_R):
-                    self.right_eye(frames_R[i])
+            def prepare(i):
+                return self._frame_pair(frames_R, frames_L, i)
 
-            time.sleep(3.0)
-            GPIO.output(7, 0)
-            GPIO.output(24, 0)
+            def show(pair):
+                self.show_eyes(*pair)
+
+            if self.pipelined:
+                with FramePipeline(prepare, range(max_frames), self.pipeline_depth) as prepared:
+                    self.scheduler.play(prepared, show, stop=self.timer)
+            else:
+                self.scheduler.play(map(prepare, range(max_frames)), show, stop=self.timer)
+
+            self.timer.wait(self.hold)
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 0)
 
             self.log.info("Display closed.")
         except Exception as e:
             self.log.error(f"Error displaying frames: {e}")
 
+    def apply_mirrors(self, frames_R, frames_L):
+        """Mirror each eye as its animation requires (see EyeAnimation.mirrored)."""
+        self.set_mirror("right", getattr(frames_R, "mirrored", False))
+        self.set_mirror("left", getattr(frames_L, "mirrored", False))
+
+    def set_mirror(self, eye, mirrored):
+        """
+        Have the panel of one eye mirror frames horizontally.
+
+        The eye is redrawn in full on its next frame, since what it shows now
+        was scanned the other way.
+
+        Args:
+            eye (str): "right" or "left".
+            mirrored (bool): Mirror the eye.
+        """
+        if self.mirrored[eye] != mirrored:
+            self.mirrored[eye] = mirrored
+            self.invalidate_eye(eye)
+
+    def _frame_pair(self, frames_R, frames_L, i):
+        """Encoded frame i of both eyes (None past the end) and its duration in ms."""
+        frame_R = self.encode_frame(frames_R[i], "right") if i < len(frames_R) else None
+        frame_L = self.encode_frame(frames_L[i], "left") if i < len(frames_L) else None
+        duration = max(self._frame_duration(frames_R, i), self._frame_duration(frames_L, i))
+        return (frame_R, frame_L), duration
+
+    def show_eyes(self, frame_R=None, frame_L=None):
+        """
+        Display one frame on each eye; None leaves that eye unchanged.
+
+        Identical frames are sent once to both eyes together.
+
+        Args:
+            frame_R (PIL.Image.Image | bytes): Frame for the right eye.
+            frame_L (PIL.Image.Image | bytes): Frame for the left eye.
+        """
+        if frame_R is not None and frame_L is not None:
+            frame_R = self.encode_frame(frame_R)
+            frame_L = self.encode_frame(frame_L)
+            if self._same_frame(frame_R, frame_L):
+                self.show_frame("both", frame_R)
+                return
+        if frame_L is not None:
+            self.left_eye(frame_L)
+        if frame_R is not None:
+            self.right_eye(frame_R)
+
+    @staticmethod
+    def _eyes(eye):
+        """Eyes addressed by "right", "left" or "both"."""
+        return ["right", "left"] if eye == "both" else [eye]
+
+    @staticmethod
+    def _pair_eyes(pair):
+        frame_R, frame_L = pair
+        return [eye for eye, frame in (("right", frame_R), ("left", frame_L)) if frame is not None]
+
+    def _on_drop(self, pair):
+        for eye in self._pair_eyes(pair):
+            self.metrics.record_drop(eye)
+
+    def _on_overrun(self, pair):
+        for eye in self._pair_eyes(pair):
+            self.metrics.record_overrun(eye)
+
+    @staticmethod
+    def _same_frame(frame_a, frame_b):
+        if frame_a is frame_b:
+            return True
+        frame_a = memoryview(frame_a).cast('B')
+        frame_b = memoryview(frame_b).cast('B')
+        return frame_a.nbytes == frame_b.nbytes and frame_a == frame_b
+
+    @staticmethod
+    def _frame_duration(frames, i):
+        """Duration of frame i in milliseconds, 0 if there is no such frame."""
+        if i >= len(frames):
+            return 0
+        durations = getattr(frames, "durations", None)
+        if durations is not None:
+            return durations[i]
+        return frames[i].info.get('duration') or DEFAULT_FRAME_DURATION
+
     def right_eye(self, frame_R):
         """
         Display a frame on the right eye.
 
         Args:
-            frame_R (PIL.Image.Image): Frame to display on the right eye.
+            frame_R (PIL.Image.Image | bytes): Frame or pre-encoded buffer to display on the right eye.
         """
-        frame_rgb_R = frame_R.convert('RGB')
-        GPIO.output(7, 0)
-        GPIO.output(24, 1)
-        self.disp.ShowImage(frame_rgb_R)
+        self.show_frame("right", frame_R)
 
     def left_eye(self, frame_L):
         """
         Display a frame on the left eye.
 
         Args:
-            frame_L (PIL.Image.Image): Frame to display on the left eye.
+            frame_L (PIL.Image.Image | bytes): Frame or pre-encoded buffer to display on the left eye.
+        """
+        self.show_frame("left", frame_L)
+
+    def encode_frame(self, frame, eye=None):
+        """
+        Encode a frame for the panel unless it is already encoded.
+
+        In RGB444 mode RGB565 buffers (from the renderers or RGB565 .reye
+        files) are converted.
+
+        Args:
+            frame (PIL.Image.Image | bytes): Frame or pre-encoded buffer.
+            eye (str): Eye the frame is for, to record the encode time in metrics.
+
+        Returns:
+            bytes: Panel-ready buffer in the display's pixel format.
+        """
+        width, height = self.disp.width, self.disp.height
+        start = time.perf_counter()
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            if self.pixel_format != RGB444 or memoryview(frame).nbytes != frame_nbytes(RGB565, width, height):
+                return frame
+            frame = rgb565_to_rgb444(frame, width, height).tobytes()
+        else:
+            frame = encode(frame, self.pixel_format)
+        if eye is not None:
+            for side in self._eyes(eye):
+                self.metrics.record_encode(side, time.perf_counter() - start)
+        return frame
+
+    def select_eye(self, eye):
+        """
+        Route the SPI bus to one eye or to both at once.
+
+        Args:
+            eye (str): "right", "left" or "both".
+        """
+        if eye == "both":
+            # Обе панели слушают шину при 7=0/24=0 - так Init и clear доходят до обоих глаз;
+            # кэши окна и MADCTL - общие для всех
+            self.disp.target = None
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 0)
+            self.disp.SetMirror(self.mirrored["right"])
+            return
+        self.disp.target = eye
+        if eye == "left":
+            self.GPIO.output(7, 1)
+            self.GPIO.output(24, 0)
+        else:
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 1)
+        self.disp.SetMirror(self.mirrored[eye])
+
+    def _is_duplicate(self, eye, frame):
+        """Check frame against the last one sent to the eye and remember it."""
+        last_frame, last_digest = self._last_sent[eye]
+        # Неизменяемый буфер можно сравнить по identity, не считая хеш
+        immutable = isinstance(frame, bytes) or (isinstance(frame, memoryview) and frame.readonly)
+        if immutable and frame is last_frame:
+            return True
+        digest = hashlib.blake2b(frame, digest_size=16).digest()
+        self._last_sent[eye] = (frame if immutable else None, digest)
+        return digest == last_digest
+
+    def invalidate_eye(self, eye=None):
+        """
+        Forget what an eye shows, e.g. after drawing on the panel directly.
+
+        The next frame is then sent in full even if it looks unchanged.
+
+        Args:
+            eye (str): "right", "left" or None for both eyes.
+        """
+        for side in ([eye] if eye else ["right", "left"]):
+            self._last_sent[side] = (None, None)
+            self._frame_diffs[side].reset()
+
+    def show_frame(self, eye, frame, dirty=None):
+        """
+        Display a frame on one eye or on both.
+
+        A frame identical to the one the eye already shows is skipped (see
+        RobotEyeDisplay.skipped). In partial update mode only the regions that
+        changed since the last frame shown on that eye are sent. With "both"
+        the frame goes to both panels in a single transfer, unless only one of
+        them needs it or their mirroring differs.
+
+        Args:
+            eye (str): "right", "left" or "both".
+            frame (PIL.Image.Image | bytes): Frame or pre-encoded RGB565 buffer.
+            dirty (list): Regions known to be the only ones changed since the last
+                frame on this eye, e.g. from Compositor.render; skips the diff.
         """
-        GPIO.output(7, 1)
-        GPIO.output(24, 0)
-        frame_rgb_L = frame_L.convert('RGB')
-        self.disp.ShowImage(frame_rgb_L)
+        frame = self.encode_frame(frame, eye)
+        eyes = self._eyes(eye)
+        if self.skip_duplicates:
+            eyes = [side for side in eyes if not self._skip_duplicate(side, frame)]
+
+        if len(eyes) == 2 and self.mirrored["right"] == self.mirrored["left"]:
+            self._send("both", frame, dirty)
+        else:
+            for side in eyes:
+                self._send(side, frame, dirty)
+
+    def _skip_duplicate(self, eye, frame):
+        """Remember the frame as sent to the eye; True (and counted) if the eye already shows it."""
+        if not self._is_duplicate(eye, frame):
+            return False
+        self.skipped[eye]["frames"] += 1
+        self.skipped[eye]["bytes"] += memoryview(frame).nbytes
+        self.metrics.record_skip(eye)
+        return True
+
+    def _new_frame_diff(self):
+        return FrameDiff(self.disp.width, self.disp.height, BYTES_PER_PIXEL[self.pixel_format],
+                         align=PIXELS_PER_GROUP[self.pixel_format])
+
+    def _changed_regions(self, eye, frame, dirty):
+        diff = self._frame_diffs[eye]
+        if dirty is not None:
+            return diff.patch(frame, dirty)
+        return diff.update(frame)
+
+    def _send(self, eye, frame, dirty=None):
+        """Send a frame to one eye or to both, in full or as changed regions."""
+        start = time.perf_counter()
+        self.select_eye(eye)
+        nbytes = memoryview(frame).nbytes
+
+        if not self.partial_updates:
+            self.disp.ShowBuffer(frame)
+        else:
+            rects = []
+            for side in self._eyes(eye):
+                changed = self._changed_regions(side, frame, dirty)
+                if changed is None:
+                    rects = None
+                elif rects is not None:
+                    # Область, не изменившаяся на одном из глаз, просто перезаписывается тем же
+                    rects.extend(rect for rect in changed if rect not in rects)
+            if rects is None:
+                self.disp.ShowBuffer(frame)
+            else:
+                nbytes = 0
+                for rect in rects:
+                    self.disp.ShowRegion(frame, *rect)
+                    nbytes += frame_nbytes(self.pixel_format, rect[2] - rect[0], rect[3] - rect[1])
+
+        elapsed = time.perf_counter() - start
+        for side in self._eyes(eye):
+            self.metrics.record_frame(side, elapsed, nbytes)
 
-    def run(self, gif_paths_R, gif_paths_L):
+    @_exclusive_playback
+    def run(self, gif_paths_R, gif_paths_L, streaming=False):
         """
         Run the robotic eye display animation.
 
         Args:
             gif_paths_R (list): List of paths to GIFs for the right eye.
             gif_paths_L (list): List of paths to GIFs for the left eye.
+            streaming (bool): Decode each GIF on demand while it plays instead of
+                loading all of them before the first frame.
         """
         try:
-            frames_R = [self.load_frames(gif_path) for gif_path in gif_paths_R]
-            frames_L = [self.load_frames(gif_path) for gif_path in gif_paths_L]
+            if streaming:
+                for gif_path_R, gif_path_L in itertools.zip_longest(gif_paths_R, gif_paths_L):
+                    if self.timer.is_set():
+                        break
+                    streams = [self.stream_animation(path) if path else FramePipeline(None, ())
+                               for path in (gif_path_R, gif_path_L)]
+                    try:
+                        self.display_stream(*streams)
+                    finally:
+                        for stream in streams:
+                            stream.close()
+                return
+
+            frames_R = [self.load_animation(gif_path) for gif_path in gif_paths_R]
+            frames_L = [self.load_animation(gif_path) for gif_path in gif_paths_L]
             print(f'Number of frames in GIF: {len(frames_L)}, {len(frames_R)}')
 
-            max_frames = max(len(frames_L), len(frames_R))
-
-            for i in range(max_frames):
-                if thread_status:
-                    break
-                if i < len(frames_R):
-                    frames_R_set = frames_R[i]
-                else:
-                    frames_R_set = []
-
-                if i < len(frames_L):
-                    frames_L_set = frames_L[i]
-                else:
-                    frames_L_set = []
-
-                self.display_frames(frames_R_set, frames_L_set)
+            self.play_animations(frames_R, frames_L)
         except KeyboardInterrupt:
             self.log.info("Keyboard interrupt detected. Exiting...")
         except Exception as e:
             self.log.error(f"An error occurred: {e}")
 
+    @_exclusive_playback
+    def play_animations(self, frames_R, frames_L):
+        """
+        Play loaded animations on both eyes, one pair after another.
+
+        With RobotEyeDisplay.transitions set, a precomputed transition is played
+        between pairs; it is built in the background while the pair before it
+        plays, and skipped (a hard cut) if it is not ready in time.
+
+        Args:
+            frames_R (list): EyeAnimation objects or frame lists for the right eye.
+            frames_L (list): EyeAnimation objects or frame lists for the left eye.
+        """
+        max_frames = max(len(frames_L), len(frames_R))
+
+        for i in range(max_frames):
+            if self.timer.is_set():
+                break
+            if i < len(frames_R):
+                frames_R_set = frames_R[i]
+            else:
+                frames_R_set = []
+
+            if i < len(frames_L):
+                frames_L_set = frames_L[i]
+            else:
+                frames_L_set = []
+
+            if self.transitions is not None and i + 1 < max_frames:
+                # Переход к следующей паре строится, пока играет текущая
+                for animations in (frames_R, frames_L):
+                    if i + 1 < len(animations):
+                        self.transitions.prepare(animations[i], animations[i + 1])
+
+            self.display_frames(frames_R_set, frames_L_set)
+
+            if self.transitions is not None and i + 1 < max_frames and not self.timer.is_set():
+                self._play_transition(frames_R, frames_L, i)
+
+    def _play_transition(self, frames_R, frames_L, i):
+        """Play the cached transitions from pair i to pair i + 1, if every eye has one ready."""
+        transitions = []
+        for animations in (frames_R, frames_L):
+            if i + 1 < len(animations):
+                transition = self.transitions.get(animations[i], animations[i + 1])
+                if transition is None:
+                    return
+                transitions.append(transition)
+            else:
+                transitions.append([])
+        self.play_transition(*transitions)
+
+    def play_transition(self, transition_R, transition_L):
+        """
+        Play transition frames on both eyes, without the lead-in and hold pauses.
+
+        Args:
+            transition_R (EyeAnimation): Transition for the right eye (see transition.TransitionCache).
+            transition_L (EyeAnimation): Transition for the left eye.
+        """
+        for eye, transition in (("right", transition_R), ("left", transition_L)):
+            if len(transition):
+                self.set_mirror(eye, getattr(transition, "mirrored", False))
+        max_frames = max(len(transition_R), len(transition_L))
+        frames = (self._frame_pair(transition_R, transition_L, i) for i in range(max_frames))
+        self.scheduler.play(frames, lambda pair: self.show_eyes(*pair), stop=self.timer)
+
+    def play_emotion(self, name):
+        """
+        Play an emotion from the library.
+
+        Args:
+            name (str): Emotion name, e.g. "Злится" or "CLASSIC-EYES/Моргает".
+        """
+        if self.library is None:
+            raise RuntimeError("No emotion library set; assign RobotEyeDisplay.library first.")
+        frames_R, frames_L = self.library.get(name, self.pixel_format)
+        self.play_animations(frames_R, frames_L)
+
+    @_exclusive_playback
+    def run_procedural(self, eye_R, eye_L=None, fps=30, duration=None):
+        """
+        Drive procedural eyes, rendering a frame for each eye at a fixed rate.
+
+        Targets set on the eyes from another thread (e.g. ProceduralEye.look)
+        are picked up on the next frame.
+
+        Args:
+            eye_R (ProceduralEye): Eye for the right panel.
+            eye_L (ProceduralEye): Eye for the left panel; None shows eye_R on both.
+            fps (float): Frames per second.
+            duration (float): Seconds to run, None to run until stopped.
+        """
+        interval = 1.0 / fps
+        start = last = deadline = self.timer.clock()
+        while not self.timer.is_set() and (duration is None or last - start < duration):
+            now = self.timer.clock()
+            eye_R.update(now - last)
+            if eye_L is not None:
+                eye_L.update(now - last)
+            last = now
+
+            frame_R = eye_R.render()
+            self.show_eyes(frame_R, eye_L.render() if eye_L is not None else frame_R)
+
+            # Отстали от графика - не наверстываем, а считаем от текущего момента
+            deadline = max(deadline + interval, self.timer.clock())
+            self.timer.wait_until(deadline)
+
+    @_exclusive_playback
+    def run_equalizer(self, full_rate=False, duration=None, update_interval=0.05):
+        """
+        Run the equalizer visualization on this thread until stopped or for a given time.
+
+        Args:
+            full_rate (bool): Show every frame on both eyes instead of alternating.
+            duration (float): Seconds to run, None to run until stopped.
+            update_interval (float): Seconds between display updates.
+        """
+        window = EqualizerLCDWindow(self.disp, self.show_frame, full_rate)
+        try:
+            start = last_update = self.timer.clock()
+            while not self.timer.is_set() and (duration is None or last_update - start < duration):
+                now = self.timer.clock()
+                window.update_display(now - last_update)
+                last_update = now
+                self.timer.wait_until(last_update + update_interval)
+        finally:
+            self.GPIO.output(7, 0)
+            self.GPIO.output(24, 0)
+
+    @contextlib.contextmanager
+    def _playback(self, stops=None):
+        """
+        Hold the panels for one playback.
+
+        A playback started while another one runs (e.g. on another thread) waits
+        for it to finish, so two never drive the bus at once. Only then is the
+        stop state reset, so a stop request the running playback has not seen
+        yet is not lost. A render command leaves that to the render thread.
+
+        Args:
+            stops (int): DeadlineTimer.stops when the playback was requested; a
+                stop requested after that is kept and ends the playback at once.
+        """
+        with self._playback_lock:
+            if self._playback_depth == 0:
+                render_thread = self.render_thread
+                if render_thread is None or not render_thread.is_render_thread():
+                    if stops is None or self.timer.stops == stops:
+                        self.timer.reset()
+            self._playback_depth += 1
+            try:
+                yield
+            finally:
+                self._playback_depth -= 1
+
+    def stop(self):
+        """
+        Stop the current playback at the next frame boundary.
+
+        Works for playback running on another thread, e.g. run() or
+        play_emotion(); with a render thread its queue is cleared as well.
+        """
+        if self.render_thread is not None:
+            self.render_thread.stop()
+        # Прямой вызов (не команда потока рендера) тоже должен остановиться
+        self.timer.stop()
+
+    def start_render_thread(self):
+        """
+        Hand the panels over to a render thread that takes non-blocking commands.
+
+        Returns:
+            RenderThread: The render thread (also RobotEyeDisplay.render_thread).
+        """
+        if self.render_thread is None:
+            self.render_thread = RenderThread(self)
+        return self.render_thread
+
     # API методы для управления эквалайзером
-    def play_equalizer(self):
-        """Запустить визуализацию эквалайзера с поочередным включением глаз"""
-        return self.equalizer_api.play()
+    def play_equalizer(self, full_rate=False):
+        """Запустить визуализацию эквалайзера с поочередным включением глаз (или на обоих сразу при full_rate)"""
+        return self.equalizer_api.play(full_rate)
 
     def stop_equalizer(self):
         """Остановить визуализацию эквалайзера"""
@@ -1,3 +1,10 @@
 from .RobotEyeDisplay import RobotEyeDisplay
 from .lcdconfig import RaspberryPi
 from .LCD_1inch28 import LCD_1inch28
+from .animation import EyeAnimation
+from .simulator import SimulatedBus
+from .aio import AsyncRobotEyeDisplay
+from .library import EmotionLibrary
+from .procedural import ProceduralEye, EyeParams
+from .renderthread import RenderThread
+from .transition import TransitionCache
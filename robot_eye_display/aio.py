@@ -0,0 +1,155 @@
+"""
+asyncio API for the robot eye display.
+
+AsyncRobotEyeDisplay wraps a RobotEyeDisplay for asyncio-based control
+stacks. Blocking work (GIF decode, encoding, SPI writes) runs on a single
+worker thread, so the bus is never used by two frames at once, while the
+event loop stays responsive. Cancelling a playback takes effect at the next
+frame boundary: a frame that is already on the bus is finished first.
+
+Example:
+    eyes = AsyncRobotEyeDisplay(RobotEyeDisplay())
+    await eyes.play_animation(['right.gif'], ['left.gif'])
+    task = asyncio.create_task(eyes.play_equalizer())
+    ...
+    await eyes.stop()
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .RobotEyeDisplay import EqualizerLCDWindow
+
+
+class AsyncRobotEyeDisplay:
+    def __init__(self, display, executor=None):
+        """
+        Initialize the AsyncRobotEyeDisplay class.
+
+        Args:
+            display (RobotEyeDisplay): Display to drive.
+            executor (concurrent.futures.Executor): Executor for blocking SPI work;
+                it must run one job at a time. Defaults to a single worker thread.
+        """
+        self.display = display
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="RobotEyeSPI")
+        self._task = None
+
+    async def _run_blocking(self, func, *args):
+        loop = asyncio.get_running_loop()
+        # shield: отменённый кадр всё равно дописывается на шину целиком
+        return await asyncio.shield(loop.run_in_executor(self._executor, func, *args))
+
+    async def _load(self, animations):
+        loaded = []
+        for animation in animations:
+            if isinstance(animation, str):
+                animation = await self._run_blocking(self.display.load_animation, animation)
+            loaded.append(animation)
+        return loaded
+
+    async def _blank(self):
+        def release():
+            self.display.GPIO.output(7, 0)
+            self.display.GPIO.output(24, 0)
+        await self._run_blocking(release)
+
+    async def _become_current(self):
+        """Stop any other playback and register the running task as current."""
+        current = asyncio.current_task()
+        if self._task is not None and self._task is not current:
+            await self.stop()
+        self._task = current
+
+    def _release(self):
+        if self._task is asyncio.current_task():
+            self._task = None
+
+    def _show_pair(self, frames_R, frames_L, pair):
+        """Encode and show frames given by index (None leaves an eye unchanged); runs on the worker."""
+        i_R, i_L = pair
+        display = self.display
+        display.show_eyes(None if i_R is None else display.encode_frame(frames_R[i_R], "right"),
+                          None if i_L is None else display.encode_frame(frames_L[i_L], "left"))
+
+    async def play_animation(self, animations_R, animations_L):
+        """
+        Play animations on both eyes, one pair after another.
+
+        Args:
+            animations_R (list): GIF paths or EyeAnimation objects for the right eye.
+            animations_L (list): GIF paths or EyeAnimation objects for the left eye.
+        """
+        await self._become_current()
+        display = self.display
+        try:
+            animations_R = await self._load(animations_R)
+            animations_L = await self._load(animations_L)
+
+            for k in range(max(len(animations_R), len(animations_L))):
+                frames_R = animations_R[k] if k < len(animations_R) else []
+                frames_L = animations_L[k] if k < len(animations_L) else []
+                max_frames = max(len(frames_R), len(frames_L))
+
+                await asyncio.sleep(display.lead_in)
+                await self._run_blocking(display.apply_mirrors, frames_R, frames_L)
+
+                async def show(pair, frames_R=frames_R, frames_L=frames_L):
+                    # Кадры PIL кодируются в рабочем потоке, а не в цикле событий
+                    await self._run_blocking(self._show_pair, frames_R, frames_L, pair)
+
+                pairs = (((i if i < len(frames_R) else None, i if i < len(frames_L) else None),
+                          max(display._frame_duration(frames_R, i), display._frame_duration(frames_L, i)))
+                         for i in range(max_frames))
+                await display.scheduler.play_async(pairs, show)
+                await asyncio.sleep(display.hold)
+                await self._blank()
+        finally:
+            self._release()
+            await self._blank()
+
+    async def play_equalizer(self, duration=None, update_interval=0.05, full_rate=False):
+        """
+        Run the equalizer visualization until stopped or for a given time.
+
+        Args:
+            duration (float): Seconds to run, None to run until stop() is called.
+            update_interval (float): Seconds between display updates.
+            full_rate (bool): Show every frame on both eyes instead of alternating.
+        """
+        await self._become_current()
+        loop = asyncio.get_running_loop()
+        window = EqualizerLCDWindow(self.display.disp, self.display.show_frame, full_rate)
+        try:
+            start = last_update = loop.time()
+            while duration is None or loop.time() - start < duration:
+                now = loop.time()
+                await self._run_blocking(window.update_display, now - last_update)
+                last_update = now
+                await asyncio.sleep(max(0.0, last_update + update_interval - loop.time()))
+        finally:
+            self._release()
+            await self._blank()
+
+    async def stop(self):
+        """
+        Stop the current animation or equalizer and wait until it has ended.
+
+        Returns:
+            bool: True if something was playing.
+        """
+        task = self._task
+        if task is None or task.done():
+            self._task = None
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        return True
+
+    def is_playing(self):
+        """Check whether an animation or the equalizer is playing."""
+        return self._task is not None and not self._task.done()
@@ -0,0 +1,141 @@
+"""
+Pre-encoded eye animations.
+
+An EyeAnimation decodes a GIF once and keeps every frame as a panel-ready
+buffer, so playback only has to push bytes to the display.
+"""
+
+from PIL import Image, ImageSequence
+
+from .pixelformat import RGB565, RGB444, encode, rgb565_to_rgb444
+
+DEFAULT_FRAME_DURATION = 100  # мс, если в GIF не задана длительность кадра
+
+
+class EyeAnimation:
+    # mmap с кадрами, если анимация загружена из скомпилированного файла
+    mapping = None
+    # Показывать зеркально по горизонтали (панель отражает сама через MADCTL)
+    mirrored = False
+
+    def __init__(self, frames, durations=None, width=240, height=240, pixel_format=RGB565, name=None):
+        """
+        Initialize the EyeAnimation class.
+
+        Args:
+            frames (list): Panel-ready frame buffers (bytes-like).
+            durations (list): Per-frame durations in milliseconds.
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            pixel_format (str): Pixel format of the buffers.
+            name (str): Optional name, usually the source path.
+        """
+        self.frames = list(frames)
+        if durations is None:
+            durations = [DEFAULT_FRAME_DURATION] * len(self.frames)
+        self.durations = list(durations)
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.name = name
+
+    @classmethod
+    def from_gif(cls, gif_path, width=240, height=240, pixel_format=RGB565):
+        """
+        Decode a GIF and encode all of its frames.
+
+        Args:
+            gif_path (str): Path to the GIF file.
+            width (int): Expected frame width.
+            height (int): Expected frame height.
+            pixel_format (str): RGB565 or RGB444.
+
+        Returns:
+            EyeAnimation: Animation with frame buffers in pixel_format.
+        """
+        frames = []
+        durations = []
+        for frame, duration in iter_gif(gif_path, width, height, pixel_format):
+            frames.append(frame)
+            durations.append(duration)
+        return cls(frames, durations, width, height, pixel_format, name=gif_path)
+
+    def convert(self, pixel_format):
+        """
+        Return the animation in another pixel format.
+
+        Only RGB565 to RGB444 is supported; the same format returns self.
+
+        Args:
+            pixel_format (str): Target pixel format.
+
+        Returns:
+            EyeAnimation: Animation with converted frames.
+        """
+        if pixel_format == self.pixel_format:
+            return self
+        if (self.pixel_format, pixel_format) != (RGB565, RGB444):
+            raise ValueError('Cannot convert {0} frames to {1}.'.format(self.pixel_format, pixel_format))
+        frames = [rgb565_to_rgb444(frame, self.width, self.height).tobytes() for frame in self.frames]
+        converted = EyeAnimation(frames, self.durations, self.width, self.height, pixel_format, self.name)
+        converted.mirrored = self.mirrored
+        return converted
+
+    def mirror(self):
+        """
+        Return a horizontally mirrored view of the animation.
+
+        The frames are shared, not copied: the panel mirrors them while
+        scanning (see LCD_1inch28.SetMirror), so a derived eye costs no
+        decoding and no frame memory.
+
+        Returns:
+            EyeAnimation: Animation with the same frames and mirrored toggled.
+        """
+        view = EyeAnimation(self.frames, self.durations, self.width, self.height, self.pixel_format, self.name)
+        view.mapping = self.mapping
+        view.mirrored = not self.mirrored
+        return view
+
+    @property
+    def frame_size(self):
+        """Size of a single frame buffer in bytes."""
+        return len(self.frames[0]) if self.frames else 0
+
+    @property
+    def nbytes(self):
+        """Total size of all frame buffers in bytes."""
+        return sum(len(frame) for frame in self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+
+def iter_gif(gif_path, width=240, height=240, pixel_format=RGB565):
+    """
+    Decode and encode GIF frames one at a time.
+
+    Only the frame being decoded is held in memory, so the first frame is
+    available right away and memory use does not depend on the GIF length.
+
+    Args:
+        gif_path (str): Path to the GIF file.
+        width (int): Expected frame width.
+        height (int): Expected frame height.
+        pixel_format (str): RGB565 or RGB444.
+
+    Yields:
+        tuple: (frame buffer, duration in milliseconds)
+    """
+    with Image.open(gif_path) as gif:
+        for frame in ImageSequence.Iterator(gif):
+            if frame.size != (width, height):
+                raise ValueError('Image must be same dimensions as display ({0}x{1}).'
+                                 .format(width, height))
+            yield encode(frame, pixel_format), frame.info.get('duration') or DEFAULT_FRAME_DURATION
@@ -0,0 +1,97 @@
+"""
+Compiled, memory-mapped animation files (.reye).
+
+A compiled animation holds panel-ready frames, so loading it needs no GIF
+decode and no encoding. The file is memory-mapped and every frame is a
+memoryview into the mapping: frames are paged in from disk when they are
+sent to SPI, and resident memory does not grow with the size of the library.
+
+Layout (little-endian):
+    header      24 bytes, see _HEADER
+    durations   frame_count x uint32, milliseconds
+    padding     up to data_offset (aligned to 64 bytes)
+    frames      frame_count x frame_size bytes, row by row
+"""
+
+import mmap
+import os
+import struct
+
+from .animation import EyeAnimation
+from .pixelformat import RGB565, RGB444
+
+EXTENSION = '.reye'
+MAGIC = b'REYE'
+VERSION = 1
+
+# magic, version, width, height, pixel format, reserved, frame count, frame size, data offset
+_HEADER = struct.Struct('<4sHHHBBIII')
+_ALIGN = 64
+
+_FORMAT_CODES = {RGB565: 0, RGB444: 1}
+_FORMAT_NAMES = {code: name for name, code in _FORMAT_CODES.items()}
+
+
+def write_animation(path, animation):
+    """
+    Write an animation to a compiled file.
+
+    Args:
+        path (str): Destination file path.
+        animation (EyeAnimation): Animation with panel-ready frames.
+    """
+    count = len(animation)
+    frame_size = animation.frame_size
+    table_end = _HEADER.size + 4 * count
+    data_offset = (table_end + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as fh:
+        fh.write(_HEADER.pack(MAGIC, VERSION, animation.width, animation.height,
+                              _FORMAT_CODES[animation.pixel_format], 0, count, frame_size, data_offset))
+        fh.write(struct.pack('<%dI' % count, *animation.durations))
+        fh.write(b'\0' * (data_offset - table_end))
+        for frame in animation.frames:
+            if len(frame) != frame_size:
+                raise ValueError('All frames must have the same size ({0} bytes).'.format(frame_size))
+            fh.write(frame)
+    os.replace(tmp_path, path)
+
+
+def load_animation(path):
+    """
+    Memory-map a compiled animation file.
+
+    Args:
+        path (str): Path to a .reye file.
+
+    Returns:
+        EyeAnimation: Animation whose frames are memoryviews into the mapped file.
+    """
+    with open(path, 'rb') as fh:
+        mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < _HEADER.size:
+        raise ValueError('{0} is not a compiled animation.'.format(path))
+    magic, version, width, height, fmt, _, count, frame_size, data_offset = _HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        raise ValueError('{0} is not a compiled animation.'.format(path))
+    if version != VERSION:
+        raise ValueError('Unsupported compiled animation version {0} in {1}.'.format(version, path))
+    if fmt not in _FORMAT_NAMES:
+        raise ValueError('Unsupported pixel format code {0} in {1}.'.format(fmt, path))
+    if len(mapping) < data_offset + count * frame_size:
+        raise ValueError('{0} is truncated.'.format(path))
+
+    durations = list(struct.unpack_from('<%dI' % count, mapping, _HEADER.size))
+    view = memoryview(mapping)
+    frames = [view[data_offset + i * frame_size:data_offset + (i + 1) * frame_size] for i in range(count)]
+
+    animation = EyeAnimation(frames, durations, width, height, _FORMAT_NAMES[fmt], name=path)
+    animation.mapping = mapping
+    return animation
+
+
+def is_compiled(path):
+    """Check whether a path names a compiled animation file."""
+    return str(path).lower().endswith(EXTENSION)
@@ -0,0 +1,207 @@
+"""
+Benchmark suite for the frame pipeline.
+
+Times every stage of getting a frame onto the panel separately, against the
+simulated SPI backend, so numbers can be compared between commits:
+
+    decode   - GIF decode as done by RobotEyeDisplay.load_frames
+    convert  - frame.convert('RGB')
+    pack     - RGB565 packing of the RGB array
+    tolist   - legacy flatten().tolist() of the packed frame
+    tobytes  - building a contiguous bytes buffer from the packed frame
+    spi      - LCD_1inch28.ShowBuffer into the simulated panel
+    show     - RobotEyeDisplay.show_frame for a pre-encoded frame (end to end)
+    equalizer_frame / equalizer_show - EqualizerLCDWindow.create_frame and sending it
+    equalizer_render - EqualizerLCDWindow.create_buffer (vectorized RGB565 renderer)
+
+Usage:
+    python -m robot_eye_display.benchmark [--gifs ExampleGIF] [--json result.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from .RobotEyeDisplay import RobotEyeDisplay, EqualizerLCDWindow
+from .pixelformat import rgb_to_rgb565
+from .simulator import SimulatedBus
+
+
+class StageTimer:
+    def __init__(self, name):
+        """
+        Collect per-frame samples for one pipeline stage.
+
+        Args:
+            name (str): Stage name.
+        """
+        self.name = name
+        self.samples = []
+        self.bytes = 0
+        self.wire_time = 0.0
+
+    def add(self, seconds, nbytes=0, wire_time=0.0):
+        self.samples.append(seconds)
+        self.bytes += nbytes
+        self.wire_time += wire_time
+
+    def result(self):
+        """
+        Summarize the collected samples.
+
+        Returns:
+            dict: frames, fps, p50_ms, p99_ms, mean_ms, bytes and modeled wire_time.
+        """
+        if not self.samples:
+            return {"frames": 0, "fps": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0,
+                    "bytes": self.bytes, "wire_time": self.wire_time}
+        samples = np.asarray(self.samples)
+        total = float(samples.sum())
+        return {
+            "frames": len(self.samples),
+            "fps": len(self.samples) / total if total > 0 else float("inf"),
+            "p50_ms": float(np.percentile(samples, 50)) * 1000,
+            "p99_ms": float(np.percentile(samples, 99)) * 1000,
+            "mean_ms": total / len(self.samples) * 1000,
+            "bytes": self.bytes,
+            "wire_time": self.wire_time,
+        }
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def create_display(spi_freq=40000000, **kwargs):
+    """
+    Create a RobotEyeDisplay wired to a simulated bus.
+
+    Args:
+        spi_freq (int): Modeled SPI clock in Hz.
+        **kwargs: Extra RobotEyeDisplay arguments.
+
+    Returns:
+        tuple: (RobotEyeDisplay, SimulatedBus)
+    """
+    bus = SimulatedBus(spi_freq=spi_freq)
+    display = RobotEyeDisplay(gpio=bus.gpio, spi=bus.SpiDev(), spi_freq=spi_freq, **kwargs)
+    return display, bus
+
+
+def bench_gifs(display, bus, gif_paths, stages):
+    """Run the GIF stages for every path and add samples to stages."""
+    for gif_path in gif_paths:
+        frames, seconds = _timed(display.load_frames, gif_path)
+        for _ in frames:
+            stages["decode"].add(seconds / max(len(frames), 1))
+
+        for frame in frames:
+            rgb, seconds = _timed(frame.convert, 'RGB')
+            stages["convert"].add(seconds)
+
+            pix, seconds = _timed(rgb_to_rgb565, np.asarray(rgb))
+            stages["pack"].add(seconds)
+
+            _, seconds = _timed(pix.flatten().tolist)
+            stages["tolist"].add(seconds)
+
+            buffer, seconds = _timed(pix.tobytes)
+            stages["tobytes"].add(seconds)
+
+            # Сырые кадры идут на левый глаз, чтобы не сбивать частичное обновление правого
+            display.select_eye("left")
+            before = bus.stats.snapshot()
+            _, seconds = _timed(display.disp.ShowBuffer, buffer)
+            after = bus.stats.snapshot()
+            stages["spi"].add(seconds, after["bytes"] - before["bytes"], after["wire_time"] - before["wire_time"])
+
+        animation = display.load_animation(gif_path)
+        for frame in animation:
+            before = bus.stats.snapshot()
+            _, seconds = _timed(display.show_frame, "right", frame)
+            after = bus.stats.snapshot()
+            stages["show"].add(seconds, after["bytes"] - before["bytes"], after["wire_time"] - before["wire_time"])
+
+
+def bench_equalizer(display, bus, frames, stages):
+    """Run the equalizer stages for a number of frames."""
+    window = EqualizerLCDWindow(display.disp, display.show_frame)
+    for _ in range(frames):
+        frame, seconds = _timed(window.create_frame)
+        stages["equalizer_frame"].add(seconds)
+
+        before = bus.stats.snapshot()
+        _, seconds = _timed(window.show_eye, "right", frame)
+        after = bus.stats.snapshot()
+        stages["equalizer_show"].add(seconds, after["bytes"] - before["bytes"],
+                                     after["wire_time"] - before["wire_time"])
+
+        _, seconds = _timed(window.create_buffer)
+        stages["equalizer_render"].add(seconds)
+
+
+def run_benchmark(gif_paths, equalizer_frames=100, spi_freq=40000000, **display_kwargs):
+    """
+    Run the full benchmark suite.
+
+    Args:
+        gif_paths (list): GIF files to benchmark.
+        equalizer_frames (int): Number of equalizer frames to render.
+        spi_freq (int): Modeled SPI clock in Hz.
+        **display_kwargs: Extra RobotEyeDisplay arguments, e.g. partial_updates=True.
+
+    Returns:
+        dict: Stage name -> summary from StageTimer.result().
+    """
+    display, bus = create_display(spi_freq, **display_kwargs)
+    names = ["decode", "convert", "pack", "tolist", "tobytes", "spi", "show",
+             "equalizer_frame", "equalizer_show", "equalizer_render"]
+    stages = {name: StageTimer(name) for name in names}
+    bench_gifs(display, bus, gif_paths, stages)
+    bench_equalizer(display, bus, equalizer_frames, stages)
+    return {name: stage.result() for name, stage in stages.items()}
+
+
+def format_results(results):
+    """Format benchmark results as a text table."""
+    lines = ["{:<16}{:>8}{:>10}{:>10}{:>10}{:>12}{:>10}".format(
+        "stage", "frames", "fps", "p50 ms", "p99 ms", "bytes", "wire s")]
+    for name, r in results.items():
+        lines.append("{:<16}{:>8}{:>10.1f}{:>10.3f}{:>10.3f}{:>12}{:>10.3f}".format(
+            name, r["frames"], r["fps"], r["p50_ms"], r["p99_ms"], r["bytes"], r["wire_time"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the robot eye frame pipeline on a simulated panel.")
+    parser.add_argument("--gifs", default="ExampleGIF", help="GIF file or directory (searched recursively)")
+    parser.add_argument("--equalizer-frames", type=int, default=100)
+    parser.add_argument("--spi-freq", type=int, default=40000000)
+    parser.add_argument("--partial", action="store_true", help="enable partial (dirty-rectangle) updates")
+    parser.add_argument("--chunk-size", type=int, help="bytes per SPI write call")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.gifs):
+        gif_paths = sorted(glob.glob(os.path.join(args.gifs, "**", "*.gif"), recursive=True))
+    else:
+        gif_paths = [args.gifs]
+
+    results = run_benchmark(gif_paths, args.equalizer_frames, args.spi_freq, partial_updates=args.partial,
+                            chunk_size=args.chunk_size)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
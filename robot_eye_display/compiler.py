@@ -0,0 +1,164 @@
+"""
+Compile GIF animations into memory-mapped .reye files.
+
+Usage:
+    robot-eye-compile ExampleGIF -o compiled
+    python -m robot_eye_display.compiler path/to/eyes.gif
+
+Directories are searched recursively and their layout is mirrored in the
+output directory. Without -o every .reye file is written next to its GIF.
+GIFs are decoded and encoded on all CPU cores (-j sets the number of worker
+processes); the workers write the .reye files themselves, so no frame data
+has to be sent back to the parent process.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .animation import EyeAnimation
+from .assetfile import EXTENSION, write_animation, load_animation
+from .pixelformat import RGB565, RGB444
+
+
+def find_gifs(sources):
+    """
+    Collect GIF files from files and directories.
+
+    Args:
+        sources (list): GIF files and/or directories.
+
+    Returns:
+        list: (gif path, path relative to its source root) tuples.
+    """
+    found = []
+    for source in sources:
+        if os.path.isdir(source):
+            for path in sorted(glob.glob(os.path.join(source, '**', '*.gif'), recursive=True)):
+                found.append((path, os.path.relpath(path, source)))
+        else:
+            found.append((source, os.path.basename(source)))
+    return found
+
+
+def output_path(gif_path, relative, out_dir=None):
+    """Return the .reye path for a GIF."""
+    if out_dir is None:
+        return os.path.splitext(gif_path)[0] + EXTENSION
+    return os.path.join(out_dir, os.path.splitext(relative)[0] + EXTENSION)
+
+
+def compile_gif(gif_path, out_path, pixel_format=RGB565):
+    """
+    Compile one GIF.
+
+    Args:
+        gif_path (str): Source GIF.
+        out_path (str): Destination .reye file.
+        pixel_format (str): RGB565 or RGB444; must match the display's pixel format.
+
+    Returns:
+        EyeAnimation: The compiled animation.
+    """
+    animation = EyeAnimation.from_gif(gif_path, pixel_format=pixel_format)
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_animation(out_path, animation)
+    return animation
+
+
+def _compile_job(gif_path, out_path, pixel_format):
+    """Compile one GIF in a worker process and return only (frames, bytes)."""
+    animation = compile_gif(gif_path, out_path, pixel_format)
+    return len(animation), animation.nbytes
+
+
+def is_up_to_date(gif_path, out_path, pixel_format=RGB565):
+    """Check whether a .reye file is newer than its GIF and in the given pixel format."""
+    try:
+        if os.path.getmtime(out_path) < os.path.getmtime(gif_path):
+            return False
+        return load_animation(out_path).pixel_format == pixel_format
+    except (OSError, ValueError):
+        return False
+
+
+def compile_all(targets, pixel_format=RGB565, jobs=None, progress=None, force=True):
+    """
+    Compile many GIFs in parallel worker processes.
+
+    Args:
+        targets (list): (gif path, .reye path) pairs.
+        pixel_format (str): RGB565 or RGB444.
+        jobs (int): Worker processes; None uses every CPU, 1 compiles in this process.
+        progress (callable): Called as progress(done, total, gif_path, result) for
+            each file as it finishes, with result as in the returned dict.
+        force (bool): Recompile files that are already up to date.
+
+    Returns:
+        dict: gif path -> (frame count, bytes), or None for files that were up to date.
+    """
+    results = {}
+    total = len(targets)
+
+    def finished(gif_path, result):
+        results[gif_path] = result
+        if progress is not None:
+            progress(len(results), total, gif_path, result)
+
+    pending = []
+    for gif_path, out_path in targets:
+        if not force and is_up_to_date(gif_path, out_path, pixel_format):
+            finished(gif_path, None)
+        else:
+            pending.append((gif_path, out_path))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) <= 1:
+        for gif_path, out_path in pending:
+            finished(gif_path, _compile_job(gif_path, out_path, pixel_format))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+        futures = {executor.submit(_compile_job, gif_path, out_path, pixel_format): gif_path
+                   for gif_path, out_path in pending}
+        for future in as_completed(futures):
+            finished(futures[future], future.result())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile GIF eye animations into memory-mapped .reye files.")
+    parser.add_argument("sources", nargs="+", help="GIF files or directories")
+    parser.add_argument("-o", "--output", help="output directory (default: next to each GIF)")
+    parser.add_argument("--format", choices=(RGB565, RGB444), default=RGB565, type=str.upper,
+                        help="pixel format of the frames (default: RGB565)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--changed", action="store_true",
+                        help="skip GIFs whose .reye file is newer and in the same format")
+    args = parser.parse_args(argv)
+
+    gifs = find_gifs(args.sources)
+    if not gifs:
+        print("No GIF files found.", file=sys.stderr)
+        return 1
+
+    out_paths = {gif_path: output_path(gif_path, relative, args.output) for gif_path, relative in gifs}
+
+    def report(done, total, gif_path, result):
+        if result is None:
+            print("[{0}/{1}] {2} is up to date".format(done, total, out_paths[gif_path]))
+        else:
+            print("[{0}/{1}] {2} -> {3} ({4} frames, {5} bytes)".format(
+                done, total, gif_path, out_paths[gif_path], result[0], result[1]))
+
+    compile_all(list(out_paths.items()), args.format, args.jobs, report, force=not args.changed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
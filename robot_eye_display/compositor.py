@@ -0,0 +1,220 @@
+"""
+Sprite and layer compositing in panel format.
+
+Sprites are rasterized once into RGB565 pixels plus an 8-bit alpha mask.
+A Compositor keeps a cached background and a stack of layers; moving a
+layer only redraws the area it left and the area it now covers, and each
+render reports those dirty bounds so the caller can send just them.
+"""
+
+import numpy as np
+
+from .pixelformat import rgb_to_rgb565
+
+
+def _unpack565(pix):
+    pix = pix.astype(np.uint16)
+    return (pix >> 11) & 0x1F, (pix >> 5) & 0x3F, pix & 0x1F
+
+
+def _union(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+class Sprite:
+    def __init__(self, pixels, alpha):
+        """
+        Initialize the Sprite class.
+
+        Args:
+            pixels (numpy.ndarray): RGB565 pixels, shape (height, width).
+            alpha (numpy.ndarray): uint8 alpha, shape (height, width); 0 is transparent.
+        """
+        self.pixels = np.asarray(pixels, dtype='>u2')
+        self.alpha = np.asarray(alpha, dtype=np.uint8)
+        self.height, self.width = self.pixels.shape
+        # Только 0/255 - можно копировать по маске без смешивания
+        self.binary = bool(np.all((self.alpha == 0) | (self.alpha == 255)))
+        self.mask = self.alpha > 0
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        Rasterize a PIL image; its alpha channel becomes the sprite alpha.
+
+        Args:
+            image (PIL.Image.Image): Sprite image, RGBA for transparency.
+
+        Returns:
+            Sprite: The sprite.
+        """
+        rgba = np.asarray(image.convert('RGBA'))
+        return cls(rgb_to_rgb565(rgba[..., :3]), rgba[..., 3])
+
+    @classmethod
+    def circle(cls, radius, color):
+        """
+        Rasterize a filled circle the way PIL draws an ellipse with a bounding
+        box of width 2 * radius.
+
+        Args:
+            radius (int): Circle radius in pixels.
+            color (tuple): RGB fill color.
+
+        Returns:
+            Sprite: Sprite of size (2 * radius + 1) squared.
+        """
+        size = 2 * radius + 1
+        ys, xs = np.mgrid[0:size, 0:size]
+        inside = (xs - radius) ** 2 + (ys - radius) ** 2 <= (radius + 0.5) ** 2
+        pixels = np.full((size, size), rgb_to_rgb565(np.array([[color]], dtype=np.uint8))[0, 0], dtype='>u2')
+        return cls(pixels, np.where(inside, 255, 0).astype(np.uint8))
+
+    def blit(self, frame, x, y):
+        """
+        Draw the sprite onto an RGB565 frame.
+
+        Args:
+            frame (numpy.ndarray): Target RGB565 array, shape (height, width).
+            x (int): Left edge in frame coordinates.
+            y (int): Top edge in frame coordinates.
+
+        Returns:
+            tuple | None: Dirty bounds (Xstart, Ystart, Xend, Yend) clipped to the frame,
+            or None if the sprite is off-screen.
+        """
+        height, width = frame.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + self.width, width), min(y + self.height, height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+
+        target = frame[y0:y1, x0:x1]
+        sx, sy = x0 - x, y0 - y
+        pixels = self.pixels[sy:sy + y1 - y0, sx:sx + x1 - x0]
+        mask = self.mask[sy:sy + y1 - y0, sx:sx + x1 - x0]
+        if self.binary:
+            target[mask] = pixels[mask]
+        else:
+            alpha = self.alpha[sy:sy + y1 - y0, sx:sx + x1 - x0].astype(np.uint16)
+            src = _unpack565(pixels)
+            dst = _unpack565(target)
+            r, g, b = [(s * alpha + d * (255 - alpha) + 127) // 255 for s, d in zip(src, dst)]
+            target[...] = (r << 11) | (g << 5) | b
+        return (x0, y0, x1, y1)
+
+
+class Layer:
+    def __init__(self, sprite, x=0, y=0, visible=True):
+        self.sprite = sprite
+        self.x = x
+        self.y = y
+        self.visible = visible
+
+    @property
+    def bounds(self):
+        return (self.x, self.y, self.x + self.sprite.width, self.y + self.sprite.height)
+
+
+class Compositor:
+    def __init__(self, width=240, height=240):
+        """
+        Initialize the Compositor class with a black background.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.background = np.zeros((height, width), dtype='>u2')
+        self.frame = np.zeros((height, width), dtype='>u2')
+        self.layers = []
+        self._dirty = (0, 0, width, height)
+        self._drawn = {}
+
+    def set_background(self, background):
+        """
+        Replace the cached background.
+
+        Args:
+            background (bytes-like | numpy.ndarray): Full-frame RGB565 buffer.
+        """
+        pix = np.frombuffer(background, dtype='>u2') if not isinstance(background, np.ndarray) else background
+        self.background[...] = pix.reshape(self.height, self.width)
+        self._dirty = (0, 0, self.width, self.height)
+
+    def add(self, sprite, x=0, y=0):
+        """
+        Put a sprite on top of the layer stack.
+
+        Returns:
+            Layer: The new layer; move it with move().
+        """
+        layer = Layer(sprite, x, y)
+        self.layers.append(layer)
+        self._dirty = _union(self._dirty, self._clip(layer.bounds))
+        return layer
+
+    def remove(self, layer):
+        self.layers.remove(layer)
+        self._dirty = _union(self._dirty, self._drawn.pop(id(layer), None))
+
+    def move(self, layer, x, y):
+        """Move a layer; its old and new areas are redrawn on the next render."""
+        if (layer.x, layer.y) == (x, y):
+            return
+        layer.x, layer.y = x, y
+        self._dirty = _union(self._dirty, self._clip(layer.bounds))
+
+    def set_visible(self, layer, visible):
+        """Show or hide a layer."""
+        if layer.visible != visible:
+            layer.visible = visible
+            self._dirty = _union(self._dirty, self._clip(layer.bounds))
+
+    def _clip(self, bounds):
+        x0, y0, x1, y1 = bounds
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width), min(y1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return (x0, y0, x1, y1)
+
+    def render(self):
+        """
+        Redraw the dirty area: background, then every layer over it in order.
+
+        Returns:
+            tuple: (memoryview of the RGB565 frame, list of dirty rects as
+            (Xstart, Ystart, Xend, Yend); empty if nothing changed).
+        """
+        dirty = self._dirty
+        for layer in self.layers:
+            # Старое место слоя тоже нужно перерисовать
+            if self._drawn.get(id(layer)) != self._clip(layer.bounds):
+                dirty = _union(dirty, self._drawn.get(id(layer)))
+        self._dirty = None
+
+        if dirty is None:
+            return self.buffer(), []
+
+        x0, y0, x1, y1 = dirty
+        self.frame[y0:y1, x0:x1] = self.background[y0:y1, x0:x1]
+        region = self.frame[y0:y1, x0:x1]
+        for layer in self.layers:
+            bounds = self._clip(layer.bounds)
+            self._drawn[id(layer)] = bounds
+            if not layer.visible or bounds is None:
+                continue
+            if bounds[0] < x1 and bounds[2] > x0 and bounds[1] < y1 and bounds[3] > y0:
+                layer.sprite.blit(region, layer.x - x0, layer.y - y0)
+        return self.buffer(), [dirty]
+
+    def buffer(self):
+        """Return the current frame as a flat RGB565 memoryview."""
+        return memoryview(self.frame.view(np.uint8).reshape(-1))
@@ -0,0 +1,121 @@
+"""
+Dirty-rectangle tracking for partial screen updates.
+
+A FrameDiff remembers the last frame sent to one panel and, for each new
+frame, returns the bounding boxes of the regions that changed. Rows that
+changed are grouped into horizontal bands, each band is narrowed to the
+columns that changed, and the caller sends only those windows.
+"""
+
+import numpy as np
+
+
+class FrameDiff:
+    def __init__(self, width=240, height=240, bytes_per_pixel=2, max_rects=4, merge_gap=8,
+                 full_frame_ratio=0.5, align=1):
+        """
+        Initialize the FrameDiff class.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            bytes_per_pixel (float): Size of one pixel in the frame buffer (1.5 for RGB444).
+            max_rects (int): Maximum number of regions returned for one frame.
+            merge_gap (int): Bands separated by fewer unchanged rows are merged.
+            full_frame_ratio (float): Share of the screen above which a full frame is sent instead.
+            align (int): Pixels packed together in the buffer (2 for RGB444); regions
+                start and end on multiples of it.
+        """
+        self.width = width
+        self.height = height
+        self.bytes_per_pixel = bytes_per_pixel
+        self.max_rects = max_rects
+        self.merge_gap = merge_gap
+        self.full_frame_ratio = full_frame_ratio
+        self.align = align
+        self._last = None
+
+    def reset(self):
+        """Forget the last frame, so the next update is a full frame."""
+        self._last = None
+
+    def _as_array(self, buffer):
+        # Сравниваем группами пикселей: у RGB444 пара пикселей занимает 3 байта
+        group_bytes = int(self.bytes_per_pixel * self.align)
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width // self.align, group_bytes)
+
+    def update(self, buffer):
+        """
+        Compare a new frame with the last one and remember it.
+
+        Args:
+            buffer (bytes-like): Full-frame buffer that is about to be sent.
+
+        Returns:
+            list | None: Changed regions as (Xstart, Ystart, Xend, Yend) tuples with
+            exclusive ends, an empty list if nothing changed, or None if the whole
+            frame should be sent.
+        """
+        frame = self._as_array(buffer)
+        last = self._last
+        if last is None:
+            self._last = frame.copy()
+            return None
+
+        changed = (frame != last).any(axis=2)
+        np.copyto(last, frame)
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return []
+
+        # Разбиваем изменившиеся строки на полосы, склеивая близкие
+        bands = []
+        start = prev = int(rows[0])
+        for row in rows[1:]:
+            row = int(row)
+            if row - prev > self.merge_gap:
+                bands.append([start, prev + 1])
+                start = row
+            prev = row
+        bands.append([start, prev + 1])
+
+        while len(bands) > self.max_rects:
+            gaps = [bands[i + 1][0] - bands[i][1] for i in range(len(bands) - 1)]
+            i = gaps.index(min(gaps))
+            bands[i][1] = bands.pop(i + 1)[1]
+
+        rects = []
+        area = 0
+        for y0, y1 in bands:
+            cols = np.flatnonzero(changed[y0:y1].any(axis=0))
+            x0, x1 = int(cols[0]) * self.align, (int(cols[-1]) + 1) * self.align
+            rects.append((x0, y0, x1, y1))
+            area += (x1 - x0) * (y1 - y0)
+
+        if area > self.full_frame_ratio * self.width * self.height:
+            return None
+        return rects
+
+    def patch(self, buffer, rects):
+        """
+        Remember a frame whose changes are already known to lie within rects.
+
+        Args:
+            buffer (bytes-like): Full-frame buffer that is about to be sent.
+            rects (list): Changed regions as (Xstart, Ystart, Xend, Yend) tuples.
+
+        Returns:
+            list | None: The regions widened to whole pixel groups, or None if
+            there is no previous frame and the whole frame must be sent.
+        """
+        frame = self._as_array(buffer)
+        if self._last is None:
+            self._last = frame.copy()
+            return None
+        aligned = []
+        for x0, y0, x1, y1 in rects:
+            g0, g1 = x0 // self.align, -(-x1 // self.align)
+            self._last[y0:y1, g0:g1] = frame[y0:y1, g0:g1]
+            aligned.append((g0 * self.align, y0, g1 * self.align, y1))
+        return aligned
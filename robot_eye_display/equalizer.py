@@ -0,0 +1,107 @@
+"""
+Vectorized equalizer renderer.
+
+EqualizerRenderer draws an EqualizerBar straight into a reusable RGB565
+buffer with NumPy. For every color scheme it precomputes, once, the column
+strip of a bar for each possible segment count (0..max_segments), so a frame
+is one slice copy per bar plus a blit of the pre-rasterized circle sprite,
+with no PIL drawing and no separate RGB565 encode.
+"""
+
+import math
+
+import numpy as np
+
+from .compositor import Sprite
+from .pixelformat import rgb_to_rgb565
+
+SEGMENT_HEIGHT = 10
+SEGMENT_GAP = 4
+SPACING = 2
+MAX_SEGMENTS = 12
+SEPARATOR_COLOR = (50, 50, 50)
+CIRCLE_COLOR = (255, 255, 255)
+
+
+def _hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _rgb565(color):
+    return int(rgb_to_rgb565(np.array([[color]], dtype=np.uint8))[0, 0])
+
+
+class EqualizerRenderer:
+    def __init__(self, width=240, height=240):
+        """
+        Initialize the EqualizerRenderer class.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+        """
+        self.width = width
+        self.height = height
+        self._frame = np.zeros((height, width), dtype='>u2')
+        self._strips = {}
+        self._circles = {}
+        self._separator = _rgb565(SEPARATOR_COLOR)
+
+    def _build_strips(self, colors, bar_width):
+        """Column strips of one bar for every segment count, as in EqualizerBar.draw."""
+        palette = [_rgb565(_hex_to_rgb(colors[min(int((segment / MAX_SEGMENTS) * (len(colors) - 1)),
+                                                      len(colors) - 1)])) for segment in range(MAX_SEGMENTS)]
+        x0 = SPACING
+        x1 = bar_width - SPACING - 1
+        strips = np.zeros((MAX_SEGMENTS + 1, self.height, bar_width), dtype='>u2')
+        for count in range(MAX_SEGMENTS + 1):
+            strip = strips[count]
+            for segment in range(count):
+                y0 = self.height - (segment + 1) * SEGMENT_HEIGHT
+                y1 = self.height - segment * SEGMENT_HEIGHT - SEGMENT_GAP
+                strip[max(y0, 0):y1 + 1, x0:x1 + 1] = palette[segment]
+                if segment < count - 1:
+                    strip[max(y0, 0):y0 + 2, x0:x1 + 1] = self._separator
+        return strips
+
+    def strips(self, colors, bar_width):
+        """Return the cached strips for a color scheme, building them on first use."""
+        key = (tuple(colors), bar_width)
+        strips = self._strips.get(key)
+        if strips is None:
+            strips = self._strips[key] = self._build_strips(colors, bar_width)
+        return strips
+
+    def render(self, equalizer):
+        """
+        Render one equalizer frame and advance its circle, like EqualizerBar.draw.
+
+        The returned buffer is reused by the next call.
+
+        Args:
+            equalizer (EqualizerBar): Equalizer state to draw.
+
+        Returns:
+            memoryview: RGB565 frame buffer, two bytes per pixel.
+        """
+        frame = self._frame
+        bar_width = self.width // equalizer.bars
+        strips = self.strips(equalizer.colors, bar_width)
+
+        frame[:, equalizer.bars * bar_width:] = 0
+        values = equalizer.values()
+        for i in range(equalizer.bars):
+            count = int((values[i] / 100.0) * MAX_SEGMENTS)
+            count = min(max(count, 0), MAX_SEGMENTS)
+            frame[:, i * bar_width:(i + 1) * bar_width] = strips[count]
+
+        circle_x, circle_y = equalizer.update_circle_position()
+        r = equalizer.circle_radius
+        sprite = self._circles.get(r)
+        if sprite is None:
+            sprite = self._circles[r] = Sprite.circle(r, CIRCLE_COLOR)
+        # Как PIL: рамка эллипса округляется вниз до целых пикселей
+        sprite.blit(frame, math.floor(circle_x - r), math.floor(circle_y - r))
+
+        return memoryview(frame.view(np.uint8).reshape(-1))
@@ -30,20 +30,40 @@
 import os
 import sys
 import time
-import spidev
 import logging
 import numpy as np
 
+try:
+    import spidev
+except ImportError:
+    # Not a Raspberry Pi: pass spi= and gpio= explicitly (see simulator.py)
+    spidev = None
+
+SPIDEV_BUFSIZ_PATH = '/sys/module/spidev/parameters/bufsiz'
+DEFAULT_CHUNK_SIZE = 4096
+
+def spidev_bufsiz(path=SPIDEV_BUFSIZ_PATH):
+    """Largest single spidev transfer allowed by the kernel, 4096 if it cannot be read"""
+    try:
+        with open(path) as fh:
+            return int(fh.read().strip())
+    except (OSError, ValueError):
+        return DEFAULT_CHUNK_SIZE
+
 class RaspberryPi:
-    def __init__(self,spi=spidev.SpiDev(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000):
-        import RPi.GPIO      
+    def __init__(self,spi=spidev.SpiDev(0,0) if spidev else None,spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_freq=100000,gpio=None,chunk_size=None):
+        if gpio is None:
+            import RPi.GPIO as gpio
         self.np=np
         self.RST_PIN= rst
         self.DC_PIN = dc
         self.BL_PIN = bl
         self.SPEED  =spi_freq
+        # Bytes per SPI write call; None: whole buffer with writebytes2, bufsiz with writebytes
+        self.chunk_size = chunk_size
+        self.spi_bufsiz = spidev_bufsiz()
         self.BL_freq=bl_freq
-        self.GPIO = RPi.GPIO
+        self.GPIO = gpio
         #self.GPIO.cleanup()
         self.GPIO.setmode(self.GPIO.BCM)
         self.GPIO.setwarnings(False)
@@ -69,6 +89,27 @@ class RaspberryPi:
     def spi_writebyte(self, data):
         if self.SPI!=None :
             self.SPI.writebytes(data)
+
+    def spi_writebuffer(self, data):
+        """Write a contiguous bytes/memoryview/NumPy buffer in chunk_size pieces without building lists"""
+        if self.SPI!=None :
+            view = memoryview(data).cast('B')
+            # writebytes2 сам делит на части по bufsiz, writebytes - нет
+            write = getattr(self.SPI, 'writebytes2', None)
+            chunk = self.chunk_size or (len(view) if write else self.spi_bufsiz)
+            write = write or self.SPI.writebytes
+            if len(view) <= chunk:
+                write(view)
+            else:
+                for i in range(0,len(view),chunk):
+                    write(view[i:i+chunk])
+
+    def set_spi_speed(self, spi_freq):
+        """Change the SPI clock in Hz"""
+        self.SPEED = spi_freq
+        if self.SPI!=None :
+            self.SPI.max_speed_hz = spi_freq
+
     def bl_DutyCycle(self, duty):
         self._pwm.ChangeDutyCycle(duty)
         
@@ -0,0 +1,324 @@
+"""
+Emotion library: an index of eye animations with a memory-budgeted cache.
+
+The animation tree is organized by emotion, for example:
+
+    ExampleGIF/
+        Злится/Adam-Black-eyes-злится.gif           same GIF for both eyes
+        Смущен/LEFT/...gif, Смущен/RIGHT/...gif      one GIF per eye
+        CLASSIC-EYES/Моргает/...gif                  nested groups
+        Adam-Black-eyes-смотрит-по-сторонам.gif      loose file, its own emotion
+
+EmotionLibrary scans such a tree once into an index of emotion name (the
+directory path relative to the root, e.g. "CLASSIC-EYES/Злится") to right
+and left eye playlists. Decoded animations are kept in an LRU cache with a
+byte budget, so repeated expressions start without decoding the GIF again.
+A compiled .reye file next to a GIF with the same name is used instead of it,
+as are the files EmotionLibrary.preload compiles into its cache directory.
+
+An emotion with only a LEFT or only a RIGHT folder declares the other eye as
+its mirror: the frames are decoded and stored once and the panel mirrors
+them (see EyeAnimation.mirror).
+"""
+
+import collections
+import os
+import threading
+
+from .animation import EyeAnimation
+from .pixelformat import RGB565
+from . import assetfile
+
+ANIMATION_EXTENSIONS = ('.gif', assetfile.EXTENSION)
+
+# Скомпилированные preload файлы лежат вне дерева анимаций
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                 'robot-eye-display')
+
+
+def load_animation(path, pixel_format=RGB565):
+    """Load a GIF or a compiled .reye file with frames in the given pixel format."""
+    if assetfile.is_compiled(path):
+        return assetfile.load_animation(path).convert(pixel_format)
+    return EyeAnimation.from_gif(path, pixel_format=pixel_format)
+
+
+class Emotion:
+    def __init__(self, name, right, left, mirrored=None):
+        """
+        One entry of the library index.
+
+        Args:
+            name (str): Emotion name.
+            right (list): Animation paths for the right eye, played in order.
+            left (list): Animation paths for the left eye, played in order.
+            mirrored (str): "right" or "left" if that eye shows its animations
+                mirrored, being derived from the other eye's assets.
+        """
+        self.name = name
+        self.right = right
+        self.left = left
+        self.mirrored = mirrored
+
+    def __repr__(self):
+        return "Emotion({0!r}, right={1!r}, left={2!r}, mirrored={3!r})".format(
+            self.name, self.right, self.left, self.mirrored)
+
+
+class AnimationCache:
+    def __init__(self, budget_bytes=32 * 1024 * 1024):
+        """
+        LRU cache of loaded animations limited by total frame size.
+
+        Memory-mapped animations are not counted against the budget, because
+        their frames live in the page cache rather than in process memory.
+
+        Args:
+            budget_bytes (int): Maximum total size of cached frames.
+        """
+        self.budget_bytes = budget_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(animation):
+        return 0 if animation.mapping is not None else animation.nbytes
+
+    def get(self, key):
+        with self._lock:
+            animation = self._items.get(key)
+            if animation is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return animation
+
+    def put(self, key, animation):
+        size = self._size(animation)
+        if size > self.budget_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= self._size(old)
+            self._items[key] = animation
+            self.nbytes += size
+            while self.nbytes > self.budget_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= self._size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class EmotionLibrary:
+    def __init__(self, root, budget_bytes=32 * 1024 * 1024, loader=load_animation, mirror=False,
+                 pixel_format=RGB565, cache_dir=None):
+        """
+        Initialize the EmotionLibrary class and scan the animation tree.
+
+        LEFT/RIGHT folders are named from the viewer's side, as in
+        ExampleRobotEyeDisplay.py: the LEFT asset is shown on the robot's
+        right eye and the RIGHT asset on its left eye.
+
+        Args:
+            root (str): Root directory of the animation tree.
+            budget_bytes (int): Byte budget of the animation cache.
+            loader (callable): Loads an animation, called as loader(path, pixel_format).
+            mirror (bool): Also derive the left eye of emotions that have both
+                LEFT and RIGHT folders by mirroring the right eye, halving decode
+                time and frame memory where the art is symmetric.
+            pixel_format (str): Default pixel format of loaded frames; pass the
+                display's so frames are not converted again while they play.
+            cache_dir (str): Directory preload compiles GIFs into; defaults to
+                DEFAULT_CACHE_DIR ($XDG_CACHE_HOME/robot-eye-display).
+        """
+        self.root = root
+        self.loader = loader
+        self.mirror = mirror
+        self.pixel_format = pixel_format
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        # (путь GIF, формат) -> скомпилированный файл, заполняется preload
+        self.compiled = {}
+        self.cache = AnimationCache(budget_bytes)
+        self.index = {}
+        self.scan()
+
+    @staticmethod
+    def _animations_in(directory):
+        names = sorted(os.listdir(directory))
+        stems = {}
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in ANIMATION_EXTENSIONS or not os.path.isfile(os.path.join(directory, name)):
+                continue
+            # Скомпилированный .reye предпочтительнее GIF с тем же именем
+            if stem not in stems or assetfile.is_compiled(name):
+                stems[stem] = os.path.join(directory, name)
+        return [stems[stem] for stem in sorted(stems)]
+
+    def scan(self):
+        """
+        Rebuild the index from the directory tree.
+
+        Returns:
+            dict: Emotion name -> Emotion.
+        """
+        index = {}
+        for directory, subdirs, _ in os.walk(self.root):
+            subdirs.sort()
+            relative = os.path.relpath(directory, self.root)
+            if os.path.basename(directory).upper() in ("LEFT", "RIGHT"):
+                continue
+
+            files = self._animations_in(directory)
+            sides = {side.upper(): os.path.join(directory, side) for side in subdirs
+                     if side.upper() in ("LEFT", "RIGHT")}
+            name = relative.replace(os.sep, "/")
+            if "LEFT" in sides and ("RIGHT" not in sides or self.mirror):
+                # Левый глаз - зеркало правого
+                right = self._animations_in(sides["LEFT"])
+                index[name] = Emotion(name, right=right, left=list(right), mirrored="left")
+            elif "RIGHT" in sides and "LEFT" not in sides:
+                left = self._animations_in(sides["RIGHT"])
+                index[name] = Emotion(name, right=list(left), left=left, mirrored="right")
+            elif sides:
+                index[name] = Emotion(name, right=self._animations_in(sides["LEFT"]),
+                                      left=self._animations_in(sides["RIGHT"]))
+            elif files and relative == os.curdir:
+                for path in files:
+                    name = os.path.splitext(os.path.basename(path))[0]
+                    index[name] = Emotion(name, right=[path], left=[path])
+            elif files:
+                index[name] = Emotion(name, right=list(files), left=list(files))
+        self.index = index
+        return index
+
+    def names(self):
+        """Return the sorted emotion names."""
+        return sorted(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def load(self, path, pixel_format=None):
+        """
+        Return the animation for a path, from the cache if possible.
+
+        Args:
+            path (str): Animation path from the index.
+            pixel_format (str): Pixel format of the frames; defaults to the library's.
+
+        Returns:
+            EyeAnimation: Loaded animation.
+        """
+        pixel_format = pixel_format or self.pixel_format
+        key = (path, pixel_format)
+        animation = self.cache.get(key)
+        if animation is None:
+            animation = self.loader(self.compiled.get(key, path), pixel_format)
+            self.cache.put(key, animation)
+        return animation
+
+    def get(self, name, pixel_format=None):
+        """
+        Load the animations of an emotion.
+
+        Args:
+            name (str): Emotion name from the index.
+            pixel_format (str): Pixel format of the frames; defaults to the library's.
+
+        Returns:
+            tuple: (right eye animations, left eye animations)
+        """
+        try:
+            emotion = self.index[name]
+        except KeyError:
+            raise KeyError("Unknown emotion {0!r}; known: {1}".format(name, ", ".join(self.names()))) from None
+        right = [self.load(path, pixel_format) for path in emotion.right]
+        left = [self.load(path, pixel_format) for path in emotion.left]
+        if emotion.mirrored == "right":
+            right = [animation.mirror() for animation in right]
+        elif emotion.mirrored == "left":
+            left = [animation.mirror() for animation in left]
+        return right, left
+
+    def warm(self, names, background=True, pixel_format=None):
+        """
+        Load emotions into the cache ahead of use.
+
+        Args:
+            names (list): Emotion names to load, most important first.
+            background (bool): Load on a daemon thread and return immediately.
+            pixel_format (str): Pixel format of the frames; defaults to the library's.
+
+        Returns:
+            threading.Thread | None: The loader thread when running in the background.
+        """
+        def load_all():
+            for name in names:
+                self.get(name, pixel_format)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="EmotionLibraryWarm", daemon=True)
+        thread.start()
+        return thread
+
+    def compiled_path(self, gif_path, pixel_format=None):
+        """
+        Return where preload writes the compiled file of a GIF.
+
+        The cache directory mirrors the absolute GIF path, per pixel format,
+        so libraries with different roots never share a file.
+        """
+        pixel_format = pixel_format or self.pixel_format
+        relative = os.path.splitext(os.path.abspath(gif_path))[0].lstrip(os.sep) + assetfile.EXTENSION
+        return os.path.join(self.cache_dir, pixel_format.lower(), relative)
+
+    def preload(self, names=None, jobs=None, progress=None, pixel_format=None):
+        """
+        Compile the GIFs of emotions in parallel and load them into the cache.
+
+        GIFs are decoded and encoded in worker processes (see compiler.compile_all)
+        into .reye files under cache_dir, outside the animation tree; files that
+        are already up to date are skipped. From then on the library loads the
+        compiled files instead of the GIFs, which only memory-maps them.
+
+        Args:
+            names (list): Emotion names; None preloads every emotion.
+            jobs (int): Worker processes; None uses every CPU.
+            progress (callable): Called as progress(done, total, gif_path, result),
+                see compiler.compile_all.
+            pixel_format (str): Pixel format to compile to; defaults to the library's.
+
+        Returns:
+            dict: gif path -> (frame count, bytes), or None for files that were up to date.
+        """
+        # Импорт здесь: compiler запускается как python -m и не должен грузиться с пакетом
+        from .compiler import compile_all
+
+        pixel_format = pixel_format or self.pixel_format
+        names = self.names() if names is None else list(names)
+        gifs = sorted({path for name in names for path in self.index[name].right + self.index[name].left
+                       if not assetfile.is_compiled(path)})
+        targets = [(path, self.compiled_path(path, pixel_format)) for path in gifs]
+        results = compile_all(targets, pixel_format, jobs, progress, force=False)
+        for path, out_path in targets:
+            self.compiled[(path, pixel_format)] = out_path
+        for name in names:
+            self.get(name, pixel_format)
+        return results
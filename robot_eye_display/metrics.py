@@ -0,0 +1,255 @@
+"""
+Per-eye display metrics.
+
+DisplayMetrics collects, for each eye, counters (frames shown, bytes sent,
+frames skipped as duplicates, frames dropped by the scheduler, deadline
+overruns) and rolling histograms of the recent encode and SPI times and
+frame intervals. snapshot() returns everything as a JSON-friendly dict;
+the same dict can be logged periodically or dumped to a file for external
+health checks:
+
+    display.metrics.start_logging(interval=60, path='/run/robot-eyes/metrics.json')
+"""
+
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+# Границы корзин гистограмм в миллисекундах
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RollingHistogram:
+    def __init__(self, window=256, buckets=BUCKETS_MS):
+        """
+        Histogram of the most recent samples.
+
+        Args:
+            window (int): Number of recent samples kept.
+            buckets (tuple): Upper bucket bounds; one more bucket holds larger values.
+        """
+        self.buckets = buckets
+        self._samples = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self._samples.append(value)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def summary(self):
+        """
+        Summarize the samples in the window.
+
+        Returns:
+            dict: count, mean, p50, p90, p99, max and per-bucket counts
+            (keyed "<=bound" and ">last bound").
+        """
+        samples = sorted(self._samples)
+        counts = {"<=%g" % bound: 0 for bound in self.buckets}
+        counts[">%g" % self.buckets[-1]] = 0
+        labels = list(counts)
+        for value in samples:
+            i = 0
+            while i < len(self.buckets) and value > self.buckets[i]:
+                i += 1
+            counts[labels[i]] += 1
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+        return {
+            "count": len(samples),
+            "mean": sum(samples) / len(samples) if samples else 0.0,
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+            "max": samples[-1] if samples else 0.0,
+            "buckets": counts,
+        }
+
+
+class EyeMetrics:
+    def __init__(self, window=256):
+        """
+        Counters and histograms of one eye.
+
+        Args:
+            window (int): Number of recent samples kept by each histogram.
+        """
+        self.frames = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.overruns = 0
+        self.encode_ms = RollingHistogram(window)
+        self.spi_ms = RollingHistogram(window)
+        self.interval_ms = RollingHistogram(window)
+        self._times = collections.deque(maxlen=window)
+
+
+class DisplayMetrics:
+    def __init__(self, eyes=("right", "left"), window=256, fps_window=5.0, clock=time.monotonic, cpu=None):
+        """
+        Initialize the DisplayMetrics class.
+
+        Args:
+            eyes (tuple): Eye names.
+            window (int): Number of recent samples kept by each histogram.
+            fps_window (float): Seconds of recent frames the fps is computed over.
+            clock (callable): Monotonic clock returning seconds.
+            cpu (callable): Returns the CPU seconds the process uses per second,
+                e.g. DeadlineTimer.cpu_per_second; reported as cpu_per_s.
+        """
+        self.window = window
+        self.fps_window = fps_window
+        self.clock = clock
+        self.cpu = cpu
+        self.log = logging.getLogger(__name__)
+        self._eye_names = tuple(eyes)
+        self._lock = threading.Lock()
+        self._logger_stop = None
+        self.reset()
+
+    def reset(self):
+        """Zero all counters and histograms."""
+        with self._lock:
+            self.eyes = {eye: EyeMetrics(self.window) for eye in self._eye_names}
+            self.started = self.clock()
+
+    def record_encode(self, eye, seconds):
+        """Record the time spent encoding one frame for an eye."""
+        with self._lock:
+            self.eyes[eye].encode_ms.add(seconds * 1000)
+
+    def record_frame(self, eye, seconds, nbytes):
+        """
+        Record a frame sent to an eye.
+
+        Args:
+            eye (str): Eye name.
+            seconds (float): Time the SPI transfer took.
+            nbytes (int): Pixel bytes sent.
+        """
+        now = self.clock()
+        with self._lock:
+            metrics = self.eyes[eye]
+            metrics.frames += 1
+            metrics.bytes += nbytes
+            metrics.spi_ms.add(seconds * 1000)
+            if metrics._times:
+                metrics.interval_ms.add((now - metrics._times[-1]) * 1000)
+            metrics._times.append(now)
+
+    def record_skip(self, eye):
+        """Record a frame not sent because the eye already showed it."""
+        with self._lock:
+            self.eyes[eye].skipped += 1
+
+    def record_drop(self, eye):
+        """Record a frame dropped because its time slot had passed."""
+        with self._lock:
+            self.eyes[eye].dropped += 1
+
+    def record_overrun(self, eye):
+        """Record a frame that was still being shown when its time slot ended."""
+        with self._lock:
+            self.eyes[eye].overruns += 1
+
+    def _fps(self, times, now):
+        recent = [t for t in times if now - t <= self.fps_window]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / (recent[-1] - recent[0]) if recent[-1] > recent[0] else 0.0
+
+    def snapshot(self):
+        """
+        Return the current metrics.
+
+        Returns:
+            dict: uptime_s, cpu_per_s (if a CPU source is set) and, per eye, frames, fps, bytes, skipped, dropped,
+            overruns and encode_ms / spi_ms / interval_ms histogram summaries.
+        """
+        now = self.clock()
+        with self._lock:
+            eyes = {}
+            for eye, metrics in self.eyes.items():
+                eyes[eye] = {
+                    "frames": metrics.frames,
+                    "fps": self._fps(metrics._times, now),
+                    "bytes": metrics.bytes,
+                    "skipped": metrics.skipped,
+                    "dropped": metrics.dropped,
+                    "overruns": metrics.overruns,
+                    "encode_ms": metrics.encode_ms.summary(),
+                    "spi_ms": metrics.spi_ms.summary(),
+                    "interval_ms": metrics.interval_ms.summary(),
+                }
+            snapshot = {"timestamp": time.time(), "uptime_s": now - self.started, "eyes": eyes}
+        if self.cpu is not None:
+            snapshot["cpu_per_s"] = self.cpu()
+        return snapshot
+
+    def dump(self, path):
+        """
+        Write a snapshot to a JSON file.
+
+        The file is replaced atomically, so a reader never sees it half-written.
+
+        Args:
+            path (str): Output path.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self.snapshot(), fh, indent=2)
+        os.replace(tmp_path, path)
+
+    def format(self, snapshot=None):
+        """Return a one-line summary of a snapshot for logging."""
+        snapshot = snapshot or self.snapshot()
+        parts = []
+        if "cpu_per_s" in snapshot:
+            parts.append("cpu {0:.1f}%".format(snapshot["cpu_per_s"] * 100))
+        for eye, m in snapshot["eyes"].items():
+            parts.append("{0}: {1} frames, {2:.1f} fps, spi p50 {3:.1f} ms / p99 {4:.1f} ms, "
+                         "{5} skipped, {6} dropped, {7} overruns".format(
+                             eye, m["frames"], m["fps"], m["spi_ms"]["p50"], m["spi_ms"]["p99"],
+                             m["skipped"], m["dropped"], m["overruns"]))
+        return "; ".join(parts)
+
+    def start_logging(self, interval=60.0, path=None):
+        """
+        Log a summary, and optionally dump a snapshot, every interval seconds.
+
+        Args:
+            interval (float): Seconds between reports.
+            path (str): JSON file to rewrite with each report, or None.
+
+        Returns:
+            threading.Thread: The reporting thread.
+        """
+        self.stop_logging()
+        stop = self._logger_stop = threading.Event()
+
+        def report():
+            while not stop.wait(interval):
+                try:
+                    snapshot = self.snapshot()
+                    self.log.info("Display metrics: %s", self.format(snapshot))
+                    if path:
+                        self.dump(path)
+                except Exception as e:
+                    self.log.error(f"Error reporting display metrics: {e}")
+
+        thread = threading.Thread(target=report, name="DisplayMetrics", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_logging(self):
+        """Stop periodic reporting."""
+        if self._logger_stop is not None:
+            self._logger_stop.set()
+            self._logger_stop = None
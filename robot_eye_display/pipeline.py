@@ -0,0 +1,85 @@
+"""
+Producer/consumer frame pipeline.
+
+FramePipeline runs a prepare function (decode, convert, encode) on a worker
+thread and hands the results to the caller through a bounded queue, so the
+next frame is being prepared while the current one is on the SPI bus.
+spidev releases the GIL during the transfer, so on multi-core boards the two
+overlap.
+"""
+
+import queue
+import threading
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+class FramePipeline:
+    def __init__(self, prepare, items, depth=2):
+        """
+        Initialize the FramePipeline class and start the worker thread.
+
+        Args:
+            prepare (callable): Called on the worker thread for every item; None
+                passes items through, e.g. when the item iterator itself does the work.
+            items (iterable): Items to prepare, in playback order.
+            depth (int): Maximum number of prepared results waiting in the queue.
+        """
+        self._prepare = prepare
+        self._items = items
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="FramePipeline", daemon=True)
+        self._thread.start()
+
+    def _put(self, value):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(value, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _worker(self):
+        try:
+            for item in self._items:
+                if self._prepare is not None:
+                    item = self._prepare(item)
+                if self._stop.is_set() or not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+            return
+        self._put(_DONE)
+
+    def __iter__(self):
+        while True:
+            result = self._queue.get()
+            if result is _DONE:
+                return
+            if isinstance(result, _Failure):
+                raise result.error
+            yield result
+
+    def close(self):
+        """Stop the worker, drop prepared results and wait for the thread to exit."""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
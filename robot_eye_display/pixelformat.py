@@ -0,0 +1,140 @@
+"""
+Pixel format encoders for the 1.28 inch GC9A01 panel.
+
+The panel is driven in 16-bit RGB565 mode, two bytes per pixel, most
+significant byte first, or optionally in 12-bit RGB444 mode, where two
+pixels are packed into three bytes (R0G0 B0R1 G1B1). The helpers below turn
+PIL images or NumPy RGB arrays into buffers that can be written to the
+panel as-is.
+"""
+
+import numpy as np
+
+RGB565 = 'RGB565'
+RGB444 = 'RGB444'
+
+BYTES_PER_PIXEL = {
+    RGB565: 2,
+    RGB444: 1.5,
+}
+
+# Пиксели, упакованные вместе: окно RGB444 должно начинаться и кончаться на чётном x
+PIXELS_PER_GROUP = {
+    RGB565: 1,
+    RGB444: 2,
+}
+
+# Значение COLMOD (0x3A) для каждого формата
+COLMOD = {
+    RGB565: 0x05,
+    RGB444: 0x03,
+}
+
+
+def frame_nbytes(pixel_format, width, height):
+    """Size in bytes of a width x height buffer in a pixel format."""
+    return int(width * height * BYTES_PER_PIXEL[pixel_format])
+
+
+def rgb_to_rgb565(rgb):
+    """
+    Pack an RGB array into RGB565 pixels.
+
+    Args:
+        rgb (numpy.ndarray): Array of shape (height, width, 3) with uint8 channels.
+
+    Returns:
+        numpy.ndarray: Big-endian uint16 array of shape (height, width).
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    r = rgb[..., 0].astype(np.uint16)
+    g = rgb[..., 1].astype(np.uint16)
+    b = rgb[..., 2].astype(np.uint16)
+    pix = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+    return pix.astype('>u2')
+
+
+def encode_rgb565(image):
+    """
+    Encode a PIL image into a panel-ready RGB565 buffer.
+
+    Args:
+        image (PIL.Image.Image): Image of any mode; it is converted to RGB first.
+
+    Returns:
+        bytes: Two bytes per pixel, row by row.
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return rgb_to_rgb565(np.asarray(image)).tobytes()
+
+
+def _pack_rgb444(r, g, b):
+    """Pack 4-bit channel arrays of shape (height, width) into three bytes per pixel pair."""
+    height, width = r.shape
+    if width % 2:
+        raise ValueError('RGB444 needs an even width, got {0}.'.format(width))
+    out = np.empty((height, width // 2, 3), dtype=np.uint8)
+    out[..., 0] = (r[:, 0::2] << 4) | g[:, 0::2]
+    out[..., 1] = (b[:, 0::2] << 4) | r[:, 1::2]
+    out[..., 2] = (g[:, 1::2] << 4) | b[:, 1::2]
+    return out.reshape(height, width * 3 // 2)
+
+
+def rgb_to_rgb444(rgb):
+    """
+    Pack an RGB array into RGB444, two pixels in three bytes.
+
+    Args:
+        rgb (numpy.ndarray): Array of shape (height, width, 3) with uint8 channels; width must be even.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width * 3 / 2).
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    return _pack_rgb444(rgb[..., 0] >> 4, rgb[..., 1] >> 4, rgb[..., 2] >> 4)
+
+
+def rgb565_to_rgb444(buffer, width=240, height=240):
+    """
+    Convert an RGB565 buffer to RGB444, keeping the top four bits of each channel.
+
+    Args:
+        buffer (bytes-like | numpy.ndarray): Big-endian RGB565 frame.
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width * 3 / 2).
+    """
+    if isinstance(buffer, np.ndarray):
+        pix = buffer.astype(np.uint16).reshape(height, width)
+    else:
+        pix = np.frombuffer(buffer, dtype='>u2').astype(np.uint16).reshape(height, width)
+    r = (pix >> 12).astype(np.uint8)
+    g = ((pix >> 7) & 0x0F).astype(np.uint8)
+    b = ((pix >> 1) & 0x0F).astype(np.uint8)
+    return _pack_rgb444(r, g, b)
+
+
+def encode_rgb444(image):
+    """
+    Encode a PIL image into a panel-ready RGB444 buffer.
+
+    Args:
+        image (PIL.Image.Image): Image of any mode; it is converted to RGB first.
+
+    Returns:
+        bytes: Three bytes per pair of pixels, row by row.
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return rgb_to_rgb444(np.asarray(image)).tobytes()
+
+
+def encode(image, pixel_format=RGB565):
+    """Encode a PIL image into a panel-ready buffer in the given pixel format."""
+    if pixel_format == RGB444:
+        return encode_rgb444(image)
+    return encode_rgb565(image)
+
@@ -0,0 +1,222 @@
+"""
+Procedural parametric eye.
+
+Instead of switching between pre-baked GIFs, a ProceduralEye draws the eye
+from a handful of parameters (gaze, pupil size, lid openness, iris color)
+straight into a reusable RGB565 buffer. Targets can be changed at any time
+and the current parameters follow them smoothly, so a gaze update shows up
+on the next frame rather than at the end of an animation.
+
+Every primitive is cached: the sclera is part of a prebuilt background, the
+iris, pupil and highlight are circle sprites, and the lids are per-row
+column spans for each openness level in whole pixels. A frame is one
+background copy, three sprite blits and one lid fill.
+
+Example:
+    eye = ProceduralEye()
+    eye.set_target(pupil_x=-0.8, openness=0.6)
+    display.run_procedural(eye)
+"""
+
+import math
+
+import numpy as np
+
+from .compositor import Sprite
+from .pixelformat import rgb_to_rgb565
+
+SCLERA_COLOR = (255, 255, 255)
+PUPIL_COLOR = (0, 0, 0)
+HIGHLIGHT_COLOR = (255, 255, 255)
+LID_COLOR = (0, 0, 0)
+MAX_CACHED_SPRITES = 64
+
+
+def _rgb565(color):
+    return int(rgb_to_rgb565(np.array([[color]], dtype=np.uint8))[0, 0])
+
+
+class EyeParams:
+    def __init__(self, pupil_x=0.0, pupil_y=0.0, pupil_size=0.5, openness=1.0, color=(40, 120, 200)):
+        """
+        Parameters of a procedural eye.
+
+        Args:
+            pupil_x (float): Horizontal gaze, -1 (left edge) to 1 (right edge).
+            pupil_y (float): Vertical gaze, -1 (top) to 1 (bottom).
+            pupil_size (float): Pupil radius as a share of the iris radius, 0 to 1.
+            openness (float): Lid openness, 0 (closed) to 1 (fully open).
+            color (tuple): RGB iris color.
+        """
+        self.pupil_x = min(max(pupil_x, -1.0), 1.0)
+        self.pupil_y = min(max(pupil_y, -1.0), 1.0)
+        self.pupil_size = min(max(pupil_size, 0.0), 1.0)
+        self.openness = min(max(openness, 0.0), 1.0)
+        self.color = tuple(color)
+
+    def replace(self, **changes):
+        """Return a copy with some parameters changed."""
+        values = dict(pupil_x=self.pupil_x, pupil_y=self.pupil_y, pupil_size=self.pupil_size,
+                      openness=self.openness, color=self.color)
+        values.update(changes)
+        return EyeParams(**values)
+
+    def lerp(self, other, t):
+        """
+        Interpolate towards other parameters.
+
+        Args:
+            other (EyeParams): Parameters at t = 1.
+            t (float): Interpolation factor, 0 to 1.
+
+        Returns:
+            EyeParams: Interpolated parameters.
+        """
+        def mix(a, b):
+            return a + (b - a) * t
+
+        return EyeParams(mix(self.pupil_x, other.pupil_x), mix(self.pupil_y, other.pupil_y),
+                         mix(self.pupil_size, other.pupil_size), mix(self.openness, other.openness),
+                         tuple(mix(a, b) for a, b in zip(self.color, other.color)))
+
+    def __repr__(self):
+        return ("EyeParams(pupil_x={0:.2f}, pupil_y={1:.2f}, pupil_size={2:.2f}, openness={3:.2f}, "
+                "color={4!r})".format(self.pupil_x, self.pupil_y, self.pupil_size, self.openness,
+                                      tuple(int(round(c)) for c in self.color)))
+
+
+class ProceduralEye:
+    def __init__(self, width=240, height=240, params=None, sclera_radius=None, iris_radius=None,
+                 smoothing=0.06):
+        """
+        Initialize the ProceduralEye class.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            params (EyeParams): Initial parameters; defaults to EyeParams().
+            sclera_radius (int): Radius of the eyeball; defaults to fill the round panel.
+            iris_radius (int): Radius of the iris; defaults to 45% of the eyeball.
+            smoothing (float): Time constant in seconds with which the current
+                parameters follow the target; 0 jumps straight to the target.
+        """
+        self.width = width
+        self.height = height
+        self.cx = width // 2
+        self.cy = height // 2
+        self.sclera_radius = sclera_radius or min(width, height) // 2 - 6
+        self.iris_radius = iris_radius or int(self.sclera_radius * 0.45)
+        self.smoothing = smoothing
+
+        self.params = params or EyeParams()
+        self.target = self.params
+
+        self._frame = np.zeros((height, width), dtype='>u2')
+        self._background = np.zeros((height, width), dtype='>u2')
+        Sprite.circle(self.sclera_radius, SCLERA_COLOR).blit(
+            self._background, self.cx - self.sclera_radius, self.cy - self.sclera_radius)
+        self._lid = _rgb565(LID_COLOR)
+        self._columns = np.arange(width)
+        self._sprites = {}
+        self._lids = {}
+
+    def set_target(self, **changes):
+        """
+        Change target parameters; the eye moves to them over the next frames.
+
+        Args:
+            **changes: EyeParams fields, e.g. pupil_x=0.5, openness=0.2.
+        """
+        # Одно присваивание ссылки: безопасно вызывать из другого потока
+        self.target = self.target.replace(**changes)
+
+    def look(self, x, y):
+        """Set the gaze target, both coordinates from -1 to 1."""
+        self.set_target(pupil_x=x, pupil_y=y)
+
+    def snap(self, **changes):
+        """Change parameters immediately, without interpolation."""
+        self.target = self.target.replace(**changes)
+        self.params = self.target
+
+    def update(self, elapsed_time):
+        """
+        Move the current parameters towards the target.
+
+        Args:
+            elapsed_time (float): Seconds since the last update.
+
+        Returns:
+            EyeParams: The current parameters.
+        """
+        if self.smoothing <= 0:
+            self.params = self.target
+        else:
+            self.params = self.params.lerp(self.target, 1.0 - math.exp(-elapsed_time / self.smoothing))
+        return self.params
+
+    def _sprite(self, radius, color):
+        key = (radius, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            # Во время смены цвета появляется много промежуточных спрайтов
+            if len(self._sprites) >= MAX_CACHED_SPRITES:
+                self._sprites.clear()
+            sprite = self._sprites[key] = Sprite.circle(radius, color)
+        return sprite
+
+    def _lid_spans(self, half_height):
+        """Visible column range of every row for a lid opening of half_height rows."""
+        spans = self._lids.get(half_height)
+        if spans is None:
+            x0 = np.full(self.height, self.width, dtype=np.int32)
+            x1 = np.zeros(self.height, dtype=np.int32)
+            if half_height > 0:
+                rows = np.arange(self.height)
+                t = (rows - self.cy) / float(half_height)
+                visible = np.abs(t) < 1.0
+                half_width = np.zeros(self.height)
+                half_width[visible] = self.sclera_radius * np.sqrt(1.0 - t[visible] ** 2)
+                x0[visible] = np.floor(self.cx - half_width[visible]).astype(np.int32)
+                x1[visible] = np.ceil(self.cx + half_width[visible]).astype(np.int32) + 1
+            spans = self._lids[half_height] = (x0[:, None], x1[:, None])
+        return spans
+
+    def render(self, params=None):
+        """
+        Draw the eye.
+
+        The returned buffer is reused by the next call.
+
+        Args:
+            params (EyeParams): Parameters to draw; defaults to the current ones.
+
+        Returns:
+            memoryview: RGB565 frame buffer, two bytes per pixel.
+        """
+        params = params or self.params
+        frame = self._frame
+        np.copyto(frame, self._background)
+
+        # Радужка не выходит за белок, в том числе по диагонали
+        reach = (self.sclera_radius - self.iris_radius) / max(1.0, math.hypot(params.pupil_x, params.pupil_y))
+        ix = self.cx + int(round(params.pupil_x * reach))
+        iy = self.cy + int(round(params.pupil_y * reach))
+        color = tuple(int(round(c)) for c in params.color)
+        iris = self._sprite(self.iris_radius, color)
+        iris.blit(frame, ix - self.iris_radius, iy - self.iris_radius)
+
+        pupil_radius = int(round(params.pupil_size * self.iris_radius))
+        if pupil_radius > 0:
+            self._sprite(pupil_radius, PUPIL_COLOR).blit(frame, ix - pupil_radius, iy - pupil_radius)
+
+        highlight_radius = max(self.iris_radius // 6, 1)
+        hx = ix - self.iris_radius // 3
+        hy = iy - self.iris_radius // 3
+        self._sprite(highlight_radius, HIGHLIGHT_COLOR).blit(frame, hx - highlight_radius, hy - highlight_radius)
+
+        if params.openness < 1.0:
+            x0, x1 = self._lid_spans(int(round(params.openness * self.sclera_radius)))
+            frame[(self._columns < x0) | (self._columns >= x1)] = self._lid
+
+        return memoryview(frame.view(np.uint8).reshape(-1))
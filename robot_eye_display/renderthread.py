@@ -0,0 +1,207 @@
+"""
+Single render thread with a priority command queue.
+
+A RenderThread owns the panels: it is the only thread that touches SPI
+and the eye select lines. Callers submit commands (play an emotion, run
+the equalizer, show a frame) and get a RenderCommand handle back at once.
+Commands run one at a time, highest priority first; a command submitted
+with a priority at least as high as the running one stops it at the next
+frame boundary, a lower one waits in the queue.
+
+Example:
+    render = display.start_render_thread()
+    render.play_emotion("Моргает")
+    render.play_emotion("Злится", priority=10)   # прерывает моргание
+"""
+
+import heapq
+import itertools
+import threading
+
+
+class RenderCommand:
+    def __init__(self, render_thread, func, args, kwargs, priority=0, name=None):
+        """
+        Initialize the RenderCommand class.
+
+        Args:
+            render_thread (RenderThread): Thread the command is queued on.
+            func (callable): Function run on the render thread.
+            args (tuple): Positional arguments of func.
+            kwargs (dict): Keyword arguments of func.
+            priority (int): Higher runs first and preempts lower.
+            name (str): Name used in log messages; defaults to the function name.
+        """
+        self.render_thread = render_thread
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.name = name or getattr(func, "__name__", repr(func))
+        self.done = threading.Event()
+        self.started = False
+        self.cancelled = False
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        """
+        Wait until the command has finished, was preempted or was cancelled.
+
+        Returns:
+            bool: True if the command is done, False on timeout.
+        """
+        return self.done.wait(timeout)
+
+    def cancel(self):
+        """Drop the command from the queue, or stop it if it is running."""
+        self.render_thread.cancel(self)
+
+    def __repr__(self):
+        return "RenderCommand({0!r}, priority={1})".format(self.name, self.priority)
+
+
+class RenderThread:
+    def __init__(self, display):
+        """
+        Start the render thread of a display.
+
+        Args:
+            display (RobotEyeDisplay): Display whose panels the thread drives.
+        """
+        self.display = display
+        self.log = display.log
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="RobotEyeRender", daemon=True)
+        self._thread.start()
+
+    @property
+    def current(self):
+        """The running command, or None when idle."""
+        return self._current
+
+    def is_render_thread(self):
+        """Whether the caller runs on this render thread, i.e. inside a command."""
+        return threading.current_thread() is self._thread
+
+    def pending(self):
+        """Return the queued commands, in the order they will run."""
+        with self._cond:
+            return [entry[2] for entry in sorted(self._queue)]
+
+    def submit(self, func, *args, priority=0, name=None, **kwargs):
+        """
+        Queue a function to run on the render thread.
+
+        Args:
+            func (callable): Function to run; it should return soon after
+                RobotEyeDisplay.timer is stopped.
+            *args: Positional arguments of func.
+            priority (int): Higher runs first; at least the running command's
+                priority stops it at its next frame boundary.
+            name (str): Name used in log messages.
+            **kwargs: Keyword arguments of func.
+
+        Returns:
+            RenderCommand: Handle to wait for or cancel the command.
+        """
+        command = RenderCommand(self, func, args, kwargs, priority, name)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Render thread is closed.")
+            heapq.heappush(self._queue, (-priority, next(self._seq), command))
+            current = self._current
+            if current is not None and priority >= current.priority:
+                self.display.timer.stop()
+            self._cond.notify()
+        return command
+
+    def play(self, frames_R, frames_L, priority=0):
+        """Play loaded animations on both eyes (see RobotEyeDisplay.play_animations)."""
+        return self.submit(self.display.play_animations, frames_R, frames_L, priority=priority)
+
+    def play_emotion(self, name, priority=0):
+        """Play an emotion from the display's library (see RobotEyeDisplay.play_emotion)."""
+        return self.submit(self.display.play_emotion, name, priority=priority, name="emotion " + name)
+
+    def play_equalizer(self, full_rate=False, duration=None, priority=0):
+        """Run the equalizer visualization (see RobotEyeDisplay.run_equalizer)."""
+        return self.submit(self.display.run_equalizer, full_rate, duration, priority=priority)
+
+    def run_procedural(self, eye_R, eye_L=None, fps=30, duration=None, priority=0):
+        """Drive procedural eyes (see RobotEyeDisplay.run_procedural)."""
+        return self.submit(self.display.run_procedural, eye_R, eye_L, fps, duration, priority=priority)
+
+    def show(self, frame_R=None, frame_L=None, priority=0):
+        """Show one frame on each eye (see RobotEyeDisplay.show_eyes)."""
+        return self.submit(self.display.show_eyes, frame_R, frame_L, priority=priority)
+
+    def cancel(self, command):
+        """
+        Drop a queued command, or stop it at its next frame boundary if it is running.
+
+        Args:
+            command (RenderCommand): Command returned by submit.
+        """
+        with self._cond:
+            command.cancelled = True
+            if command is self._current:
+                self.display.timer.stop()
+                return
+            queued = [entry for entry in self._queue if entry[2] is not command]
+            if len(queued) != len(self._queue):
+                self._queue = queued
+                heapq.heapify(self._queue)
+                command.done.set()
+
+    def stop(self):
+        """Drop every queued command and stop the running one at its next frame boundary."""
+        with self._cond:
+            for _, _, command in self._queue:
+                command.cancelled = True
+                command.done.set()
+            self._queue = []
+            if self._current is not None:
+                self.display.timer.stop()
+
+    def close(self, timeout=2.0):
+        """
+        Stop everything and end the thread.
+
+        Args:
+            timeout (float): Seconds to wait for the running command to stop.
+        """
+        self.stop()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self.display.render_thread is self:
+            self.display.render_thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                command = heapq.heappop(self._queue)[2]
+                self._current = command
+                command.started = True
+                # Остановка относится к предыдущей команде, новая начинает с чистого листа
+                self.display.timer.reset()
+
+            try:
+                command.result = command.func(*command.args, **command.kwargs)
+            except Exception as e:
+                command.error = e
+                self.log.error(f"Error in render command {command.name}: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                command.done.set()
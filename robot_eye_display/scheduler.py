@@ -0,0 +1,166 @@
+"""
+Deadline-based frame scheduling.
+
+FrameScheduler plays frames at the timestamps encoded in the animation
+(the GIF frame durations) against a monotonic clock. A frame whose whole
+time slot has already passed when its turn comes is dropped rather than
+shown late, so a slow pipeline never makes the animation drift.
+"""
+
+import asyncio
+import time
+
+
+class FrameScheduler:
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize the FrameScheduler class.
+
+        Args:
+            clock (callable): Monotonic clock returning seconds.
+            sleep (callable): Function used to wait, called with seconds.
+        """
+        self.clock = clock
+        self.sleep = sleep
+        # Вызываются с кадром, пропущенным или не уложившимся в свой слот
+        self.on_drop = None
+        self.on_overrun = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the frame and jitter counters."""
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.overruns = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+    def _wait(self, seconds, stop):
+        if seconds <= 0:
+            return
+        if stop is not None and hasattr(stop, "wait"):
+            stop.wait(seconds)
+        else:
+            self.sleep(seconds)
+
+    @staticmethod
+    def _stopped(stop):
+        if stop is None:
+            return False
+        if hasattr(stop, "is_set"):
+            return stop.is_set()
+        return stop()
+
+    def _dropped(self, frame):
+        self.frames_dropped += 1
+        if self.on_drop is not None:
+            self.on_drop(frame)
+
+    def _shown(self, frame, slot_end):
+        self.frames_shown += 1
+        if self.clock() > slot_end:
+            self.overruns += 1
+            if self.on_overrun is not None:
+                self.on_overrun(frame)
+
+    def play(self, frames, show, stop=None):
+        """
+        Play frames at their deadlines.
+
+        The last frame is never dropped, so the animation always ends on its
+        final pose, and its duration is waited out before returning.
+
+        Args:
+            frames (iterable): (frame, duration_ms) pairs.
+            show (callable): Called with each frame that is due.
+            stop (threading.Event | DeadlineTimer | callable): Stop request checked before
+                every frame; an Event or a timer also interrupts waiting.
+
+        Returns:
+            bool: True if all frames were played, False if stopped.
+        """
+        frames = iter(frames)
+        current = next(frames, None)
+        deadline = self.clock()
+
+        while current is not None:
+            if self._stopped(stop):
+                return False
+            upcoming = next(frames, None)
+            frame, duration = current
+            slot_end = deadline + duration / 1000.0
+
+            now = self.clock()
+            if upcoming is not None and now >= slot_end:
+                # Слот кадра уже прошёл - пропускаем его, а не сдвигаем расписание
+                self._dropped(frame)
+            else:
+                self._wait(deadline - now, stop)
+                if self._stopped(stop):
+                    return False
+                lateness = max(0.0, self.clock() - deadline)
+                self.jitter_total += lateness
+                self.jitter_max = max(self.jitter_max, lateness)
+                show(frame)
+                self._shown(frame, slot_end)
+
+            deadline = slot_end
+            current = upcoming
+
+        self._wait(deadline - self.clock(), stop)
+        return not self._stopped(stop)
+
+    async def play_async(self, frames, show):
+        """
+        Coroutine version of play for asyncio callers.
+
+        Waiting is done with asyncio.sleep, so cancelling the task stops
+        playback at the next frame boundary.
+
+        Args:
+            frames (iterable): (frame, duration_ms) pairs.
+            show (coroutine function): Awaited with each frame that is due.
+        """
+        frames = iter(frames)
+        current = next(frames, None)
+        deadline = self.clock()
+
+        while current is not None:
+            upcoming = next(frames, None)
+            frame, duration = current
+            slot_end = deadline + duration / 1000.0
+
+            now = self.clock()
+            if upcoming is not None and now >= slot_end:
+                self._dropped(frame)
+            else:
+                if deadline > now:
+                    await asyncio.sleep(deadline - now)
+                lateness = max(0.0, self.clock() - deadline)
+                self.jitter_total += lateness
+                self.jitter_max = max(self.jitter_max, lateness)
+                await show(frame)
+                self._shown(frame, slot_end)
+
+            deadline = slot_end
+            current = upcoming
+
+        remaining = deadline - self.clock()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def snapshot(self):
+        """
+        Return the playback counters.
+
+        Returns:
+            dict: frames_shown, frames_dropped, overruns, jitter_mean_ms and jitter_max_ms.
+        """
+        mean = self.jitter_total / self.frames_shown if self.frames_shown else 0.0
+        return {
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+            "overruns": self.overruns,
+            "jitter_mean_ms": mean * 1000,
+            "jitter_max_ms": self.jitter_max * 1000,
+        }
@@ -0,0 +1,357 @@
+"""
+Software GC9A01 panels and GPIO/SPI backend.
+
+SimulatedBus stands in for RPi.GPIO and spidev so the whole display pipeline
+can run on a plain Linux machine. The SPI byte stream is decoded the way the
+GC9A01 controller decodes it (DC low = command, DC high = parameters or pixel
+data) into an in-memory framebuffer per eye, and every transfer is recorded
+together with the time it would take on the wire at the configured SPI clock.
+
+Example:
+    bus = SimulatedBus()
+    display = RobotEyeDisplay(gpio=bus.gpio, spi=bus.SpiDev())
+    display.right_eye(frame)
+    bus.panels["right"].image().save("right.png")
+    print(bus.stats.snapshot())
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+# Команды GC9A01, которые влияют на содержимое кадра
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+RAMWRC = 0x3C
+MADCTL = 0x36
+COLMOD = 0x3A
+SLPOUT = 0x11
+DISPON = 0x29
+
+MADCTL_MY = 0x80
+MADCTL_MX = 0x40
+
+# COLMOD: 12 бит - два пикселя в трёх байтах
+COLMOD_12BIT = 0x03
+
+
+class SpiStats:
+    def __init__(self):
+        """Counters for traffic on the simulated SPI bus."""
+        self.reset()
+
+    def reset(self):
+        """Zero all counters."""
+        self.bytes = 0
+        self.command_bytes = 0
+        self.data_bytes = 0
+        self.transactions = 0
+        self.wire_time = 0.0
+        self.gpio_writes = 0
+
+    def record(self, nbytes, speed_hz, command):
+        self.bytes += nbytes
+        self.transactions += 1
+        self.wire_time += nbytes * 8.0 / speed_hz
+        if command:
+            self.command_bytes += nbytes
+        else:
+            self.data_bytes += nbytes
+
+    def snapshot(self):
+        """
+        Return the counters as a dict.
+
+        Returns:
+            dict: bytes, command_bytes, data_bytes, transactions, wire_time (s), gpio_writes.
+        """
+        return {
+            "bytes": self.bytes,
+            "command_bytes": self.command_bytes,
+            "data_bytes": self.data_bytes,
+            "transactions": self.transactions,
+            "wire_time": self.wire_time,
+            "gpio_writes": self.gpio_writes,
+        }
+
+
+class SimulatedPanel:
+    def __init__(self, name, width=240, height=240):
+        """
+        Initialize the SimulatedPanel class.
+
+        Args:
+            name (str): Panel name, "left" or "right".
+            width (int): Panel width in pixels.
+            height (int): Panel height in pixels.
+        """
+        self.name = name
+        self.width = width
+        self.height = height
+        self.framebuffer = np.zeros((height, width), dtype=np.uint16)
+        self.madctl = 0x00
+        self.colmod = 0x06
+        self.sleeping = True
+        self.display_on = False
+        self.commands = {}
+        self.pixels_written = 0
+        self._command = None
+        self._params = bytearray()
+        self._columns = (0, width - 1)
+        self._rows = (0, height - 1)
+        self._cursor = 0
+        self._pending = b""
+
+    def write_command(self, cmd):
+        """Start a new command; parameters follow with DC high."""
+        self._command = cmd
+        self._params = bytearray()
+        self._pending = b""
+        self.commands[cmd] = self.commands.get(cmd, 0) + 1
+        if cmd == RAMWR:
+            self._cursor = 0
+        elif cmd == SLPOUT:
+            self.sleeping = False
+        elif cmd == DISPON:
+            self.display_on = True
+
+    def write_data(self, data):
+        """Feed parameter or pixel bytes for the current command."""
+        if self._command in (RAMWR, RAMWRC):
+            self._write_pixels(data)
+            return
+
+        self._params.extend(data)
+        if self._command == CASET and len(self._params) >= 4:
+            p = self._params
+            self._columns = ((p[0] << 8) | p[1], (p[2] << 8) | p[3])
+        elif self._command == RASET and len(self._params) >= 4:
+            p = self._params
+            self._rows = ((p[0] << 8) | p[1], (p[2] << 8) | p[3])
+        elif self._command == MADCTL and self._params:
+            self.madctl = self._params[0]
+        elif self._command == COLMOD and self._params:
+            self.colmod = self._params[0]
+
+    def _decode_pixels(self, data):
+        """Decode pixel bytes into RGB565 values; an incomplete pixel (or pair) is kept for the next write."""
+        data = self._pending + bytes(data)
+        if (self.colmod & 0x07) == COLMOD_12BIT:
+            usable = len(data) - len(data) % 3
+            self._pending = data[usable:]
+            packed = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, 3).astype(np.uint16)
+            nibbles = np.empty((packed.shape[0], 6), dtype=np.uint16)
+            nibbles[:, 0::2] = packed >> 4
+            nibbles[:, 1::2] = packed & 0x0F
+            r, g, b = nibbles.reshape(-1, 3).T
+            # 4 бита канала растягиваются до 5/6 бит, как при выводе панелью
+            return ((r << 12) | ((r >> 3) << 11) | (g << 7) | ((g >> 2) << 5) | (b << 1) | (b >> 3)).astype(np.uint16)
+        usable = len(data) - len(data) % 2
+        self._pending = data[usable:]
+        return np.frombuffer(data[:usable], dtype='>u2').astype(np.uint16)
+
+    def _write_pixels(self, data):
+        pix = self._decode_pixels(data)
+        if pix.size == 0:
+            return
+        x0, x1 = self._columns
+        y0, y1 = self._rows
+        win_w = x1 - x0 + 1
+        win_h = y1 - y0 + 1
+        if win_w <= 0 or win_h <= 0:
+            return
+        idx = (self._cursor + np.arange(pix.size)) % (win_w * win_h)
+        xs = x0 + idx % win_w
+        ys = y0 + idx // win_w
+        if self.madctl & MADCTL_MX:
+            xs = self.width - 1 - xs
+        if self.madctl & MADCTL_MY:
+            ys = self.height - 1 - ys
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.framebuffer[ys[inside], xs[inside]] = pix[inside]
+        self._cursor = (self._cursor + pix.size) % (win_w * win_h)
+        self.pixels_written += int(pix.size)
+
+    def rgb(self):
+        """
+        Return the panel contents as an RGB array.
+
+        Returns:
+            numpy.ndarray: uint8 array of shape (height, width, 3).
+        """
+        fb = self.framebuffer
+        rgb = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        rgb[..., 0] = (fb >> 8) & 0xF8
+        rgb[..., 1] = (fb >> 3) & 0xFC
+        rgb[..., 2] = (fb << 3) & 0xF8
+        return rgb
+
+    def image(self):
+        """Return the panel contents as a PIL image."""
+        return Image.fromarray(self.rgb(), "RGB")
+
+    def rgb565(self):
+        """Return the panel contents as a big-endian RGB565 buffer."""
+        return self.framebuffer.astype('>u2').tobytes()
+
+
+class SimulatedPWM:
+    def __init__(self, pin, frequency):
+        self.pin = pin
+        self.frequency = frequency
+        self.duty = 0
+
+    def start(self, duty):
+        self.duty = duty
+
+    def stop(self):
+        self.duty = 0
+
+    def ChangeDutyCycle(self, duty):
+        self.duty = duty
+
+    def ChangeFrequency(self, freq):
+        self.frequency = freq
+
+
+class SimulatedGPIO:
+    """Subset of the RPi.GPIO module used by this library."""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    HIGH = 1
+    LOW = 0
+    PWM = SimulatedPWM
+
+    def __init__(self, bus):
+        self._bus = bus
+        self.pins = {}
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, mode, initial=0):
+        self.pins.setdefault(pin, initial)
+
+    def output(self, pin, value):
+        self.pins[pin] = 1 if value else 0
+        self._bus.stats.gpio_writes += 1
+
+    def input(self, pin):
+        return self.pins.get(pin, 0)
+
+    def cleanup(self, *args):
+        self.pins.clear()
+
+
+class SimulatedSpiDev:
+    """Subset of spidev.SpiDev that feeds the simulated panels."""
+
+    def __init__(self, bus, spi_bus=0, device=0, bufsiz=4096):
+        self._bus = bus
+        self.spi_bus = spi_bus
+        self.device = device
+        self.bufsiz = bufsiz
+        self.max_speed_hz = bus.spi_freq
+        self.mode = 0
+        self.closed = False
+
+    def _transfer(self, data):
+        self._bus.stats.record(len(data), self.max_speed_hz or self._bus.spi_freq, self._bus.command_mode)
+        self._bus.deliver(data)
+
+    def writebytes(self, data):
+        if len(data) > self.bufsiz:
+            raise OverflowError("Argument list size exceeds %d bytes." % self.bufsiz)
+        self._transfer(bytes(data))
+
+    def writebytes2(self, data):
+        view = memoryview(data).cast('B')
+        for i in range(0, len(view), self.bufsiz):
+            self._transfer(view[i:i + self.bufsiz])
+
+    def xfer(self, data, *args):
+        self.writebytes(data)
+        return [0] * len(data)
+
+    xfer2 = xfer
+
+    def close(self):
+        self.closed = True
+
+
+class SimulatedBus:
+    def __init__(self, width=240, height=240, spi_freq=40000000, dc_pin=25, left_pin=7, right_pin=24,
+                 realtime=False):
+        """
+        Initialize the SimulatedBus class.
+
+        The eye select lines follow RobotEyeDisplay: pin 7 high routes the bus
+        to the left eye, pin 24 high to the right eye, and with neither high
+        (as during Init) both panels listen. Both high is not a known
+        addressing state, so SPI traffic in it raises an error.
+
+        Args:
+            width (int): Panel width in pixels.
+            height (int): Panel height in pixels.
+            spi_freq (int): Modeled SPI clock in Hz.
+            dc_pin (int): Data/command GPIO.
+            left_pin (int): Left eye select GPIO.
+            right_pin (int): Right eye select GPIO.
+            realtime (bool): Sleep for the modeled wire time of each transfer.
+        """
+        self.spi_freq = spi_freq
+        self.dc_pin = dc_pin
+        self.left_pin = left_pin
+        self.right_pin = right_pin
+        self.realtime = realtime
+        self.stats = SpiStats()
+        self.gpio = SimulatedGPIO(self)
+        self.panels = {
+            "left": SimulatedPanel("left", width, height),
+            "right": SimulatedPanel("right", width, height),
+        }
+
+    def SpiDev(self, spi_bus=0, device=0, bufsiz=4096):
+        """Create an SPI device attached to this bus."""
+        return SimulatedSpiDev(self, spi_bus, device, bufsiz)
+
+    @property
+    def command_mode(self):
+        return not self.gpio.pins.get(self.dc_pin, 0)
+
+    def selected_panels(self):
+        """
+        Return the panels that currently receive SPI traffic.
+
+        Raises:
+            RuntimeError: Both select lines are high.
+        """
+        left = self.gpio.pins.get(self.left_pin, 0)
+        right = self.gpio.pins.get(self.right_pin, 0)
+        if left and right:
+            raise RuntimeError('SPI transfer with both eye select lines high (pins {0} and {1}); '
+                               'use both low to address both eyes.'.format(self.left_pin, self.right_pin))
+        if left:
+            return [self.panels["left"]]
+        if right:
+            return [self.panels["right"]]
+        return list(self.panels.values())
+
+    def deliver(self, data):
+        command = self.command_mode
+        for panel in self.selected_panels():
+            if command:
+                for cmd in bytes(data):
+                    panel.write_command(cmd)
+            else:
+                panel.write_data(data)
+        if self.realtime:
+            time.sleep(len(data) * 8.0 / self.spi_freq)
@@ -0,0 +1,134 @@
+"""
+Shared monotonic deadline timer.
+
+Timed playback (animations, the equalizer, procedural eyes) sleeps until
+the next frame is due instead of polling the clock. A DeadlineTimer waits
+on a condition variable against the monotonic clock, so it does not jump
+when NTP corrects the wall clock, and any thread can cut a wait short:
+
+    stop()  - end playback; every wait returns at once until reset()
+    wake()  - something changed (e.g. the equalizer was stopped); waits in
+              wait_until return early once, so the loop can look again
+
+A timer can be passed wherever a stop threading.Event is expected
+(FrameScheduler.play, FramePipeline), since it has is_set() and wait().
+
+The timer also samples the process CPU clock whenever a wait ends, so
+cpu_per_second() tells how much CPU the process used per second of playback.
+"""
+
+import collections
+import threading
+import time
+
+
+class DeadlineTimer:
+    def __init__(self, clock=time.monotonic, cpu_clock=time.process_time, cpu_window=5.0):
+        """
+        Initialize the DeadlineTimer class.
+
+        Args:
+            clock (callable): Monotonic clock returning seconds.
+            cpu_clock (callable): CPU time clock returning seconds.
+            cpu_window (float): Seconds of recent samples cpu_per_second averages over.
+        """
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.cpu_window = cpu_window
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._generation = 0
+        # Сколько раз запрашивалась остановка
+        self.stops = 0
+        self._cpu_samples = collections.deque(maxlen=256)
+        self._sample()
+
+    def stop(self):
+        """Request a stop: current and future waits return at once until reset()."""
+        with self._cond:
+            self._stopped = True
+            self.stops += 1
+            self._cond.notify_all()
+
+    def reset(self):
+        """Forget a stop request."""
+        with self._cond:
+            self._stopped = False
+
+    def is_set(self):
+        """Whether a stop was requested (same as threading.Event.is_set)."""
+        return self._stopped
+
+    def wake(self):
+        """Cut short the waits in wait_until without requesting a stop."""
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def wait_until(self, deadline):
+        """
+        Sleep until a deadline on the timer's clock.
+
+        Args:
+            deadline (float): Clock time to wake up at.
+
+        Returns:
+            bool: True if the deadline was reached, False if stop() or wake()
+            ended the wait early.
+        """
+        with self._cond:
+            generation = self._generation
+            # Condition.wait может проснуться раньше срока, поэтому цикл
+            while not self._stopped and self._generation == generation:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            reached = not self._stopped and self._generation == generation
+        self._sample()
+        return reached
+
+    def wait(self, timeout=None):
+        """
+        Sleep for up to timeout seconds, ending early only on stop().
+
+        Same as threading.Event.wait, so FrameScheduler can wait on the timer.
+
+        Returns:
+            bool: True if a stop was requested.
+        """
+        with self._cond:
+            if timeout is None:
+                while not self._stopped:
+                    self._cond.wait()
+            else:
+                deadline = self.clock() + timeout
+                while not self._stopped:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            stopped = self._stopped
+        self._sample()
+        return stopped
+
+    def _sample(self):
+        self._cpu_samples.append((self.clock(), self.cpu_clock()))
+
+    def cpu_per_second(self):
+        """
+        CPU time used by the process per second over the last cpu_window seconds.
+
+        Returns:
+            float: CPU seconds per second; 1.0 is one core fully busy.
+        """
+        self._sample()
+        samples = list(self._cpu_samples)
+        now, cpu = samples[-1]
+        # Самый свежий отсчёт не моложе окна, иначе самый старый
+        then, cpu_then = samples[0]
+        for sample in samples:
+            if now - sample[0] < self.cpu_window:
+                break
+            then, cpu_then = sample
+        return (cpu - cpu_then) / (now - then) if now > then else 0.0
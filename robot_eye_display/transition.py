@@ -0,0 +1,213 @@
+"""
+Precomputed transitions between animations.
+
+Instead of a hard cut from the last frame of one animation to the first
+frame of the next, a short crossfade or blink-through sequence can be
+played in between. Blending in the render loop would cost a decode, blend
+and encode per frame; here each transition is built once, in panel
+format, on a background thread the first time a pair of animations is
+used, and then played like any other EyeAnimation.
+
+Example:
+    display.transitions = TransitionCache(style=BLINK)
+    display.play_animations(frames_R, frames_L)
+"""
+
+import collections
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .animation import EyeAnimation
+from .pixelformat import RGB565, RGB444, BYTES_PER_PIXEL, _pack_rgb444, rgb565_to_rgb444
+
+CROSSFADE = 'crossfade'
+BLINK = 'blink'
+
+
+def _unpack(buffer, pixel_format, width, height):
+    """Split a panel buffer into an array of native-depth channels, shape (height, width, 3)."""
+    if pixel_format == RGB444:
+        packed = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width // 2, 3)
+        channels = np.empty((height, width, 3), dtype=np.uint8)
+        channels[:, 0::2, 0] = packed[..., 0] >> 4
+        channels[:, 0::2, 1] = packed[..., 0] & 0x0F
+        channels[:, 0::2, 2] = packed[..., 1] >> 4
+        channels[:, 1::2, 0] = packed[..., 1] & 0x0F
+        channels[:, 1::2, 1] = packed[..., 2] >> 4
+        channels[:, 1::2, 2] = packed[..., 2] & 0x0F
+        return channels
+    pix = np.frombuffer(buffer, dtype='>u2').astype(np.uint16).reshape(height, width)
+    return np.stack(((pix >> 11) & 0x1F, (pix >> 5) & 0x3F, pix & 0x1F), axis=-1).astype(np.uint8)
+
+
+def _pack(channels, pixel_format):
+    """Inverse of _unpack: return a panel buffer as bytes."""
+    channels = channels.astype(np.uint16)
+    r, g, b = channels[..., 0], channels[..., 1], channels[..., 2]
+    if pixel_format == RGB444:
+        return _pack_rgb444(r.astype(np.uint8), g.astype(np.uint8), b.astype(np.uint8)).tobytes()
+    return ((r << 11) | (g << 5) | b).astype('>u2').tobytes()
+
+
+def _edge_frame(animation, index, pixel_format, mirrored):
+    """Channels of one frame of an animation, in pixel_format and scanned as mirrored."""
+    frame = animation.frames[index]
+    if animation.pixel_format != pixel_format:
+        if (animation.pixel_format, pixel_format) != (RGB565, RGB444):
+            raise ValueError('Cannot convert {0} frames to {1}.'.format(animation.pixel_format, pixel_format))
+        frame = rgb565_to_rgb444(frame, animation.width, animation.height)
+    channels = _unpack(frame, pixel_format, animation.width, animation.height)
+    # Панель отражает кадры сама; переход показывается в ориентации второй анимации
+    if animation.mirrored != mirrored:
+        channels = channels[:, ::-1]
+    return channels
+
+
+def _crossfade(start, end, steps):
+    """Blend from start towards end; the last frame is end itself."""
+    frames = []
+    start = start.astype(np.float32)
+    end = end.astype(np.float32)
+    for step in range(1, steps + 1):
+        t = step / float(steps)
+        frames.append(np.rint(start + (end - start) * t))
+    return frames
+
+
+def _blink(start, end, steps):
+    """Lids close over start, then open over end until it is fully open; rows outside the opening are black."""
+    height = start.shape[0]
+    center = height / 2.0
+    rows = np.abs(np.arange(height) + 0.5 - center)
+    closing = steps // 2
+    frames = []
+    for step in range(steps):
+        if step < closing:
+            source, openness = start, 1.0 - (step + 1.0) / (closing + 1)
+        else:
+            source, openness = end, (step - closing + 1.0) / (steps - closing)
+        frame = source.copy()
+        frame[rows >= openness * center] = 0
+        frames.append(frame)
+    return frames
+
+
+def build_transition(animation_a, animation_b, style=CROSSFADE, steps=8, duration=240):
+    """
+    Build the frames played between two animations.
+
+    Args:
+        animation_a (EyeAnimation): Animation that ends; its last frame is the start.
+        animation_b (EyeAnimation): Animation that follows; its first frame is the end.
+        style (str): CROSSFADE or BLINK.
+        steps (int): Number of transition frames.
+        duration (int): Total duration of the transition in milliseconds.
+
+    Returns:
+        EyeAnimation: Transition in animation_b's pixel format and mirroring.
+    """
+    if style not in (CROSSFADE, BLINK):
+        raise ValueError('Unknown transition style {0!r}.'.format(style))
+    if (animation_a.width, animation_a.height) != (animation_b.width, animation_b.height):
+        raise ValueError('Animations differ in size: {0}x{1} and {2}x{3}.'.format(
+            animation_a.width, animation_a.height, animation_b.width, animation_b.height))
+
+    pixel_format = animation_b.pixel_format
+    start = _edge_frame(animation_a, len(animation_a) - 1, pixel_format, animation_b.mirrored)
+    end = _edge_frame(animation_b, 0, pixel_format, animation_b.mirrored)
+    channels = _crossfade(start, end, steps) if style == CROSSFADE else _blink(start, end, steps)
+
+    frames = [_pack(frame, pixel_format) for frame in channels]
+    durations = [max(duration // steps, 1)] * len(frames)
+    transition = EyeAnimation(frames, durations, animation_b.width, animation_b.height, pixel_format,
+                              name='{0} -> {1}'.format(animation_a.name, animation_b.name))
+    transition.mirrored = animation_b.mirrored
+    return transition
+
+
+class TransitionCache:
+    def __init__(self, style=CROSSFADE, steps=8, duration=240, max_entries=16, executor=None):
+        """
+        Initialize the TransitionCache class.
+
+        A cached transition of 8 frames takes 8 panel frames of memory
+        (about 0.9 MB in RGB565), so max_entries bounds the memory used.
+
+        Args:
+            style (str): CROSSFADE or BLINK.
+            steps (int): Number of transition frames.
+            duration (int): Total duration of a transition in milliseconds.
+            max_entries (int): Transitions kept; the least recently used are dropped.
+            executor (concurrent.futures.Executor): Executor that builds transitions;
+                by default one background thread.
+        """
+        self.style = style
+        self.steps = steps
+        self.duration = duration
+        self.max_entries = max_entries
+        self.log = logging.getLogger(__name__)
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="RobotEyeTransition")
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supports(animation_a, animation_b):
+        """Whether a transition can be built: both must be non-empty EyeAnimation-like objects."""
+        return all(getattr(animation, "pixel_format", None) in BYTES_PER_PIXEL and len(animation) > 0
+                   for animation in (animation_a, animation_b))
+
+    def prepare(self, animation_a, animation_b):
+        """
+        Start building the transition from one animation to another unless it is cached.
+
+        Returns:
+            concurrent.futures.Future | None: Future of the transition, or None if
+            the animations are not supported.
+        """
+        if not self.supports(animation_a, animation_b):
+            return None
+        # Зеркальные виды делят кадры с оригиналом, поэтому отражение входит в ключ
+        key = (id(animation_a.frames), animation_a.mirrored, id(animation_b.frames), animation_b.mirrored)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[2]
+            future = self._executor.submit(build_transition, animation_a, animation_b,
+                                           self.style, self.steps, self.duration)
+            # Анимации храним вместе с переходом, чтобы id их кадров не достался другим
+            self._entries[key] = (animation_a, animation_b, future)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return future
+
+    def get(self, animation_a, animation_b):
+        """
+        Return the transition if it is built; otherwise start building it.
+
+        Never blocks, so a transition that is not ready yet is simply skipped.
+
+        Returns:
+            EyeAnimation | None: The transition, or None if it is not available yet.
+        """
+        future = self.prepare(animation_a, animation_b)
+        if future is None or not future.done():
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            self.log.warning(f"Cannot build transition from {animation_a.name} to {animation_b.name}: {e}")
+            return None
+
+    def clear(self):
+        """Drop every cached transition."""
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        """Drop the cache and stop the background thread."""
+        self.clear()
+        self._executor.shutdown(wait=False)
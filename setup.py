@@ -13,5 +13,10 @@ setup(
     author_email='a@nesterof.com',
     description='Robot eye display use for TFT-display 1.28 inch',
     long_description_content_type="text/markdown",
-    long_description=long_description
+    long_description=long_description,
+    entry_points={
+        'console_scripts': [
+            'robot-eye-compile=robot_eye_display.compiler:main',
+        ],
+    },
 )
@@ -0,0 +1,64 @@
+"""
+Helpers shared by the tests: a display on the simulated bus and small
+synthetic frames, so most tests need neither hardware nor GIF decoding.
+"""
+
+import numpy as np
+
+from robot_eye_display import RobotEyeDisplay, SimulatedBus
+from robot_eye_display.animation import EyeAnimation
+from robot_eye_display.pixelformat import RGB565, RGB444, rgb_to_rgb565, rgb_to_rgb444
+
+SIZE = 240
+
+
+def make_display(**kwargs):
+    """
+    Create a RobotEyeDisplay on a SimulatedBus.
+
+    Returns:
+        tuple: (SimulatedBus, RobotEyeDisplay).
+    """
+    bus = SimulatedBus()
+    display = RobotEyeDisplay(gpio=bus.gpio, spi=bus.SpiDev(), **kwargs)
+    return bus, display
+
+
+def encode_rgb(rgb, pixel_format=RGB565):
+    """Encode an RGB array into a panel buffer."""
+    if pixel_format == RGB444:
+        return rgb_to_rgb444(rgb).tobytes()
+    return rgb_to_rgb565(rgb).tobytes()
+
+
+def moving_square_frames(count=6, pixel_format=RGB565, seed=0):
+    """
+    Frames of a noisy background with a square moving over it by odd steps.
+
+    Each frame changes only around the square, so partial updates send
+    small regions, and the odd offsets exercise RGB444 pixel pair alignment.
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 256, (SIZE, SIZE, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        rgb = background.copy()
+        x, y = 11 + 17 * i, 7 + 13 * i
+        rgb[y:y + 31, x:x + 31] = (255, 255 - 40 * i, 40 * i)
+        # Одиночный пиксель на нечётном x - проверка выравнивания пар RGB444
+        rgb[200, 3 + 2 * i] = (0, 255, 0)
+        frames.append(encode_rgb(rgb, pixel_format))
+    return frames
+
+
+def make_animation(count=3, pixel_format=RGB565, duration=50, seed=0, name=None):
+    """Return an EyeAnimation of random frames."""
+    rng = np.random.default_rng(seed)
+    frames = [encode_rgb(rng.integers(0, 256, (SIZE, SIZE, 3), dtype=np.uint8), pixel_format)
+              for _ in range(count)]
+    return EyeAnimation(frames, [duration] * count, SIZE, SIZE, pixel_format, name=name)
+
+
+def panel_array(frame):
+    """A big-endian RGB565 buffer as a (SIZE, SIZE) array, comparable to a panel framebuffer."""
+    return np.frombuffer(frame, dtype='>u2').reshape(SIZE, SIZE)
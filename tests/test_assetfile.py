@@ -0,0 +1,163 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from robot_eye_display import compiler
+from robot_eye_display.assetfile import _HEADER, is_compiled, load_animation, write_animation
+from robot_eye_display.pixelformat import RGB565, RGB444
+
+from .support import SIZE, make_animation, make_display
+
+
+class TempDirTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+
+class RoundTripTest(TempDirTest):
+    def round_trip(self, animation):
+        path = os.path.join(self.tmp, "eye.reye")
+        write_animation(path, animation)
+        return path, load_animation(path)
+
+    def assert_round_trip(self, pixel_format):
+        animation = make_animation(3, pixel_format, duration=70)
+        animation.durations[1] = 120
+        _, loaded = self.round_trip(animation)
+        self.assertEqual((loaded.width, loaded.height, loaded.pixel_format), (SIZE, SIZE, pixel_format))
+        self.assertEqual(loaded.durations, [70, 120, 70])
+        self.assertEqual([bytes(frame) for frame in loaded.frames], animation.frames)
+        self.assertIsNotNone(loaded.mapping)
+
+    def test_rgb565(self):
+        self.assert_round_trip(RGB565)
+
+    def test_rgb444(self):
+        self.assert_round_trip(RGB444)
+
+    def test_display_plays_compiled_file(self):
+        animation = make_animation(2)
+        path, _ = self.round_trip(animation)
+        bus, display = make_display()
+        loaded = display.load_animation(path)
+        display.right_eye(loaded[1])
+        self.assertEqual(bus.panels["right"].rgb565(), animation.frames[1])
+
+    def test_mixed_frame_sizes_raise(self):
+        animation = make_animation(2)
+        animation.frames[1] = animation.frames[1][:-2]
+        with self.assertRaises(ValueError):
+            write_animation(os.path.join(self.tmp, "eye.reye"), animation)
+
+    def test_truncated_file_raises(self):
+        path, _ = self.round_trip(make_animation(2))
+        with open(path, "r+b") as fh:
+            fh.truncate(os.path.getsize(path) - 1)
+        with self.assertRaises(ValueError):
+            load_animation(path)
+
+    def test_unknown_pixel_format_raises(self):
+        path, _ = self.round_trip(make_animation(1))
+        with open(path, "rb") as fh:
+            header = list(_HEADER.unpack(fh.read(_HEADER.size)))
+        header[4] = 7
+        with open(path, "r+b") as fh:
+            fh.write(_HEADER.pack(*header))
+        with self.assertRaises(ValueError):
+            load_animation(path)
+
+    def test_not_compiled_raises(self):
+        path = os.path.join(self.tmp, "eye.reye")
+        with open(path, "wb") as fh:
+            fh.write(b"GIF89a" + bytes(64))
+        with self.assertRaises(ValueError):
+            load_animation(path)
+
+    def test_is_compiled(self):
+        self.assertTrue(is_compiled("eyes/Злится.REYE"))
+        self.assertFalse(is_compiled("eyes/Злится.gif"))
+
+
+class CompilerTest(TempDirTest):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp, "gifs")
+        self.out = os.path.join(self.tmp, "out")
+        os.makedirs(os.path.join(self.src, "Злится"))
+        self.gif = os.path.join(self.src, "Злится", "eyes.gif")
+        frames = [Image.new("RGB", (SIZE, SIZE), color) for color in ("red", "blue")]
+        frames[0].save(self.gif, save_all=True, append_images=frames[1:], duration=80, loop=0)
+        self.reye = os.path.join(self.out, "Злится", "eyes.reye")
+
+    def compile(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = compiler.main(list(args))
+        self.assertEqual(status, 0)
+        return output.getvalue()
+
+    def test_compiles_into_output_tree(self):
+        report = self.compile(self.src, "-o", self.out)
+        self.assertIn("2 frames", report)
+        animation = load_animation(self.reye)
+        self.assertEqual((len(animation), animation.durations), (2, [80, 80]))
+
+    def test_format(self):
+        self.compile(self.src, "-o", self.out, "--format", "rgb444")
+        animation = load_animation(self.reye)
+        self.assertEqual((animation.pixel_format, animation.frame_size), (RGB444, SIZE * SIZE * 3 // 2))
+
+    def test_compiles_next_to_gif(self):
+        self.compile(self.gif)
+        self.assertTrue(os.path.exists(os.path.splitext(self.gif)[0] + ".reye"))
+
+    def test_parallel_jobs(self):
+        second = os.path.join(self.src, "Злится", "other.gif")
+        shutil.copy(self.gif, second)
+        report = self.compile(self.src, "-o", self.out, "-j", "2")
+        self.assertIn("[2/2]", report)
+        for path in (self.reye, os.path.join(self.out, "Злится", "other.reye")):
+            self.assertEqual(len(load_animation(path)), 2)
+
+    def test_changed_skips_up_to_date(self):
+        self.compile(self.src, "-o", self.out)
+        self.assertTrue(compiler.is_up_to_date(self.gif, self.reye))
+        report = self.compile(self.src, "-o", self.out, "--changed")
+        self.assertIn("is up to date", report)
+
+    def test_changed_recompiles_stale(self):
+        self.compile(self.src, "-o", self.out)
+        gif_mtime = os.path.getmtime(self.gif)
+        os.utime(self.reye, (gif_mtime - 10, gif_mtime - 10))
+        self.assertFalse(compiler.is_up_to_date(self.gif, self.reye))
+        report = self.compile(self.src, "-o", self.out, "--changed")
+        self.assertIn("2 frames", report)
+        self.assertTrue(compiler.is_up_to_date(self.gif, self.reye))
+
+    def test_changed_recompiles_other_format(self):
+        self.compile(self.src, "-o", self.out)
+        self.assertFalse(compiler.is_up_to_date(self.gif, self.reye, RGB444))
+        self.compile(self.src, "-o", self.out, "--changed", "--format", "rgb444")
+        self.assertEqual(load_animation(self.reye).pixel_format, RGB444)
+
+    def test_without_changed_recompiles(self):
+        self.compile(self.src, "-o", self.out)
+        self.assertIn("2 frames", self.compile(self.src, "-o", self.out))
+
+    def test_missing_output_is_stale(self):
+        self.assertFalse(compiler.is_up_to_date(self.gif, self.reye))
+
+    def test_no_gifs(self):
+        os.makedirs(self.out)
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(compiler.main([self.out]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
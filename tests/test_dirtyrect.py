@@ -0,0 +1,102 @@
+import os
+import unittest
+
+import numpy as np
+
+from robot_eye_display.animation import EyeAnimation
+from robot_eye_display.dirtyrect import FrameDiff
+from robot_eye_display.pixelformat import RGB565, RGB444
+
+from .support import make_display, moving_square_frames, panel_array
+
+EXAMPLE_GIF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "ExampleGIF", "Злится", "Adam-Black-eyes-злится.gif")
+
+
+class FrameDiffTest(unittest.TestCase):
+    def test_first_frame_is_full(self):
+        diff = FrameDiff(8, 8)
+        self.assertIsNone(diff.update(bytes(8 * 8 * 2)))
+
+    def test_unchanged_frame_has_no_regions(self):
+        diff = FrameDiff(8, 8)
+        diff.update(bytes(8 * 8 * 2))
+        self.assertEqual(diff.update(bytes(8 * 8 * 2)), [])
+
+    def test_changed_pixels_are_bounded(self):
+        diff = FrameDiff(16, 16, full_frame_ratio=1.0)
+        frame = np.zeros((16, 16), dtype='>u2')
+        diff.update(frame.tobytes())
+        frame[3, 5] = 0xFFFF
+        frame[4, 9] = 0xFFFF
+        self.assertEqual(diff.update(frame.tobytes()), [(5, 3, 10, 5)])
+
+    def test_distant_bands_are_separate(self):
+        diff = FrameDiff(16, 32, merge_gap=4, full_frame_ratio=1.0)
+        frame = np.zeros((32, 16), dtype='>u2')
+        diff.update(frame.tobytes())
+        frame[2, 1] = 0xFFFF
+        frame[20, 7] = 0xFFFF
+        self.assertEqual(diff.update(frame.tobytes()), [(1, 2, 2, 3), (7, 20, 8, 21)])
+
+    def test_bands_are_merged_down_to_max_rects(self):
+        diff = FrameDiff(16, 32, max_rects=1, merge_gap=0, full_frame_ratio=1.0)
+        frame = np.zeros((32, 16), dtype='>u2')
+        diff.update(frame.tobytes())
+        frame[2, 1] = 0xFFFF
+        frame[20, 7] = 0xFFFF
+        self.assertEqual(diff.update(frame.tobytes()), [(1, 2, 8, 21)])
+
+    def test_large_change_sends_full_frame(self):
+        diff = FrameDiff(16, 16, full_frame_ratio=0.5)
+        diff.update(bytes(16 * 16 * 2))
+        self.assertIsNone(diff.update(b"\xff" * (16 * 16 * 2)))
+
+    def test_reset_forgets_last_frame(self):
+        diff = FrameDiff(8, 8)
+        diff.update(bytes(8 * 8 * 2))
+        diff.reset()
+        self.assertIsNone(diff.update(bytes(8 * 8 * 2)))
+
+
+class PartialUpdateTest(unittest.TestCase):
+    """Partial updates must leave the panels exactly as full updates do."""
+
+    def play(self, frames, partial_updates, **kwargs):
+        bus, display = make_display(partial_updates=partial_updates, **kwargs)
+        bus.stats.reset()
+        shown = []
+        for frame in frames:
+            display.right_eye(frame)
+            display.left_eye(frame)
+            shown.append({name: panel.framebuffer.copy() for name, panel in bus.panels.items()})
+        return shown, bus.stats.snapshot()["bytes"]
+
+    def assert_identical(self, frames, **kwargs):
+        full, full_bytes = self.play(frames, False, **kwargs)
+        partial, partial_bytes = self.play(frames, True, **kwargs)
+        for i, (a, b) in enumerate(zip(full, partial)):
+            for name in ("left", "right"):
+                np.testing.assert_array_equal(a[name], b[name], err_msg="frame {0}, {1} eye".format(i, name))
+        self.assertLess(partial_bytes, full_bytes)
+        return full
+
+    def test_moving_square(self):
+        frames = moving_square_frames()
+        shown = self.assert_identical(frames)
+        np.testing.assert_array_equal(shown[-1]["right"], panel_array(frames[-1]))
+
+    def test_rgb444_odd_columns(self):
+        self.assert_identical(moving_square_frames(pixel_format=RGB444), pixel_format=RGB444)
+
+    def test_rgb565_frames_on_rgb444_display(self):
+        self.assert_identical(moving_square_frames(pixel_format=RGB565), pixel_format=RGB444)
+
+    @unittest.skipUnless(os.path.exists(EXAMPLE_GIF), "example GIFs are not available")
+    def test_example_gif(self):
+        animation = EyeAnimation.from_gif(EXAMPLE_GIF)
+        self.assert_identical(animation.frames[:12])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from robot_eye_display.assetfile import is_compiled, load_animation, write_animation
+from robot_eye_display.library import AnimationCache, EmotionLibrary
+from robot_eye_display.pixelformat import RGB565, RGB444
+
+from .support import SIZE, make_animation, make_display
+
+
+class AnimationCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.animations = {key: make_animation(2, seed=i, name=key) for i, key in enumerate("abcd")}
+        self.size = self.animations["a"].nbytes
+
+    def test_evicts_least_recently_used(self):
+        cache = AnimationCache(budget_bytes=int(self.size * 2.5))
+        cache.put("a", self.animations["a"])
+        cache.put("b", self.animations["b"])
+        self.assertIs(cache.get("a"), self.animations["a"])
+        cache.put("c", self.animations["c"])
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.nbytes, 2 * self.size)
+
+    def test_stays_within_budget(self):
+        cache = AnimationCache(budget_bytes=int(self.size * 2.5))
+        for key, animation in self.animations.items():
+            cache.put(key, animation)
+            self.assertLessEqual(cache.nbytes, cache.budget_bytes)
+        self.assertEqual([key for key in "abcd" if key in cache], ["c", "d"])
+
+    def test_hits_and_misses(self):
+        cache = AnimationCache(budget_bytes=self.size)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", self.animations["a"])
+        cache.get("a")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_oversized_animation_is_not_cached(self):
+        cache = AnimationCache(budget_bytes=self.size - 1)
+        cache.put("a", self.animations["a"])
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_replacing_key_does_not_count_twice(self):
+        cache = AnimationCache(budget_bytes=self.size * 4)
+        cache.put("a", self.animations["a"])
+        cache.put("a", self.animations["b"])
+        self.assertEqual((len(cache), cache.nbytes), (1, self.size))
+
+    def test_mapped_animations_are_free(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        path = os.path.join(tmp, "a.reye")
+        write_animation(path, self.animations["a"])
+        cache = AnimationCache(budget_bytes=self.size)
+        cache.put("mapped", load_animation(path))
+        cache.put("a", self.animations["a"])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, self.size)
+
+
+class EmotionLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        for path in ("Злится/angry.gif", "Смущен/LEFT/a.gif", "Смущен/RIGHT/b.gif",
+                     "CLASSIC-EYES/Моргает/blink.gif", "CLASSIC-EYES/Моргает/blink.reye", "look.gif"):
+            path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "wb").close()
+        self.loaded = []
+
+    def loader(self, path, pixel_format):
+        self.loaded.append((os.path.relpath(path, self.root), pixel_format))
+        return make_animation(1, pixel_format, name=path)
+
+    def library(self, **kwargs):
+        return EmotionLibrary(self.root, loader=self.loader, **kwargs)
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.root).replace(os.sep, "/") for path in paths]
+
+    def test_index(self):
+        library = self.library()
+        self.assertEqual(library.names(), ["CLASSIC-EYES/Моргает", "look", "Злится", "Смущен"])
+        emotion = library.index["Смущен"]
+        # LEFT/RIGHT названы со стороны зрителя
+        self.assertEqual(self.relative(emotion.right), ["Смущен/LEFT/a.gif"])
+        self.assertEqual(self.relative(emotion.left), ["Смущен/RIGHT/b.gif"])
+        self.assertEqual(self.relative(library.index["Злится"].right), ["Злится/angry.gif"])
+
+    def test_compiled_file_replaces_gif(self):
+        emotion = self.library().index["CLASSIC-EYES/Моргает"]
+        self.assertEqual(self.relative(emotion.right), ["CLASSIC-EYES/Моргает/blink.reye"])
+
+    def test_animations_are_cached(self):
+        library = self.library()
+        right, left = library.get("Злится")
+        library.get("Злится")
+        self.assertEqual(self.loaded, [(os.path.join("Злится", "angry.gif"), RGB565)])
+        self.assertIs(right[0], left[0])
+
+    def test_pixel_format_is_part_of_cache_key(self):
+        library = self.library(pixel_format=RGB444)
+        self.assertEqual(library.get("Злится")[0][0].pixel_format, RGB444)
+        library.get("Злится", RGB565)
+        library.get("Злится", RGB444)
+        self.assertEqual([pixel_format for _, pixel_format in self.loaded], [RGB444, RGB565])
+
+    def test_play_emotion_loads_display_format(self):
+        bus, display = make_display(pixel_format=RGB444, lead_in=0, hold=0)
+        display.library = self.library()
+        display.play_emotion("Злится")
+        self.assertEqual(self.loaded, [(os.path.join("Злится", "angry.gif"), RGB444)])
+        reference_bus, reference = make_display(pixel_format=RGB444)
+        reference.right_eye(display.library.get("Злится", RGB444)[0][0].frames[-1])
+        np.testing.assert_array_equal(bus.panels["right"].framebuffer, reference_bus.panels["right"].framebuffer)
+
+    def test_unknown_emotion(self):
+        with self.assertRaises(KeyError):
+            self.library().get("Спит")
+
+    def test_warm(self):
+        library = self.library()
+        library.warm(["Смущен"], background=False)
+        self.assertEqual(len(self.loaded), 2)
+
+
+class PreloadTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        for path in (self.root, self.cache_dir):
+            self.addCleanup(shutil.rmtree, path, True)
+        for path in ("Злится/angry.gif", "Смущен/LEFT/a.gif"):
+            path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(path))
+            frames = [Image.new("RGB", (SIZE, SIZE), color) for color in ("red", "blue", "green")]
+            frames[0].save(path, save_all=True, append_images=frames[1:], duration=60, loop=0)
+
+    def test_preload_compiles_into_cache_dir(self):
+        library = EmotionLibrary(self.root, cache_dir=self.cache_dir)
+        results = library.preload(jobs=1)
+        self.assertEqual(sorted(result for result in results.values()), [(3, 3 * SIZE * SIZE * 2)] * 2)
+        # Дерево анимаций остаётся без .reye файлов
+        for _, _, files in os.walk(self.root):
+            self.assertFalse(any(is_compiled(name) for name in files))
+        gif = library.index["Злится"].right[0]
+        self.assertTrue(library.compiled_path(gif).startswith(self.cache_dir))
+        self.assertTrue(os.path.exists(library.compiled_path(gif)))
+        # Загружается скомпилированный файл, а не GIF
+        self.assertIsNotNone(library.get("Злится")[0][0].mapping)
+
+    def test_preload_skips_up_to_date(self):
+        EmotionLibrary(self.root, cache_dir=self.cache_dir).preload(jobs=1)
+        results = EmotionLibrary(self.root, cache_dir=self.cache_dir).preload(["Злится"], jobs=1)
+        self.assertEqual(list(results.values()), [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
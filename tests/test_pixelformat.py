@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from robot_eye_display.dirtyrect import FrameDiff
+from robot_eye_display.pixelformat import (RGB565, RGB444, BYTES_PER_PIXEL, PIXELS_PER_GROUP, _pack_rgb444,
+                                           frame_nbytes, rgb_to_rgb444, rgb_to_rgb565, rgb565_to_rgb444)
+
+
+class Rgb444Test(unittest.TestCase):
+    def test_pair_packing(self):
+        r = np.array([[0xF, 0x3]], dtype=np.uint8)
+        g = np.array([[0x1, 0x4]], dtype=np.uint8)
+        b = np.array([[0x2, 0x5]], dtype=np.uint8)
+        self.assertEqual(_pack_rgb444(r, g, b).tobytes(), bytes([0xF1, 0x23, 0x45]))
+
+    def test_keeps_top_four_bits(self):
+        rgb = np.array([[[0xFF, 0x80, 0x0F], [0x12, 0x34, 0x56]]], dtype=np.uint8)
+        self.assertEqual(rgb_to_rgb444(rgb).tobytes(), bytes([0xF8, 0x01, 0x35]))
+
+    def test_odd_width_raises(self):
+        with self.assertRaises(ValueError):
+            rgb_to_rgb444(np.zeros((4, 5, 3), dtype=np.uint8))
+
+    def test_frame_size(self):
+        self.assertEqual(frame_nbytes(RGB565, 240, 240), 240 * 240 * 2)
+        self.assertEqual(frame_nbytes(RGB444, 240, 240), 240 * 240 * 3 // 2)
+        self.assertEqual(rgb_to_rgb444(np.zeros((240, 240, 3), dtype=np.uint8)).nbytes,
+                         frame_nbytes(RGB444, 240, 240))
+
+    def test_rgb565_conversion_matches_direct_encoding(self):
+        rgb = np.random.default_rng(1).integers(0, 256, (8, 16, 3), dtype=np.uint8)
+        converted = rgb565_to_rgb444(rgb_to_rgb565(rgb).tobytes(), 16, 8)
+        np.testing.assert_array_equal(converted, rgb_to_rgb444(rgb))
+
+
+class PixelGroupAlignmentTest(unittest.TestCase):
+    def frame_diff(self, width=16, height=4):
+        return FrameDiff(width, height, BYTES_PER_PIXEL[RGB444], full_frame_ratio=1.0,
+                         align=PIXELS_PER_GROUP[RGB444])
+
+    def test_odd_pixel_widens_to_pair(self):
+        diff = self.frame_diff()
+        rgb = np.zeros((4, 16, 3), dtype=np.uint8)
+        diff.update(rgb_to_rgb444(rgb).tobytes())
+        rgb[1, 5] = 255
+        self.assertEqual(diff.update(rgb_to_rgb444(rgb).tobytes()), [(4, 1, 6, 2)])
+
+    def test_patch_widens_to_pair(self):
+        diff = self.frame_diff()
+        frame = rgb_to_rgb444(np.zeros((4, 16, 3), dtype=np.uint8)).tobytes()
+        diff.update(frame)
+        self.assertEqual(diff.patch(frame, [(3, 0, 7, 2)]), [(2, 0, 8, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import threading
+import time
+import unittest
+
+from .support import make_animation, make_display
+
+
+class RenderThreadTest(unittest.TestCase):
+    def setUp(self):
+        self.bus, self.display = make_display(lead_in=0, hold=0)
+        self.render = self.display.start_render_thread()
+        self.addCleanup(self.render.close)
+
+    def block(self, priority=0):
+        """Submit a command that runs until released; return (command, release event)."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(5.0)
+
+        command = self.render.submit(blocker, priority=priority)
+        self.assertTrue(started.wait(5.0))
+        return command, release
+
+    def stop_requested(self, timeout=5.0):
+        """Wait for a stop request of the display, like a playback between frames."""
+        return self.display.timer.wait(timeout)
+
+    def wait_stopped(self, started):
+        """Command body: report whether the display asked it to stop."""
+        started.set()
+        return self.stop_requested()
+
+    def test_runs_highest_priority_first(self):
+        order = []
+        command, release = self.block(priority=10)
+        queued = [self.render.submit(order.append, name, priority=priority)
+                  for name, priority in (("low", 1), ("high", 5), ("mid", 3), ("high2", 5))]
+        self.assertEqual([queued_command.args[0] for queued_command in self.render.pending()],
+                         ["high", "high2", "mid", "low"])
+        release.set()
+        for queued_command in queued:
+            self.assertTrue(queued_command.wait(5.0))
+        self.assertEqual(order, ["high", "high2", "mid", "low"])
+
+    def test_higher_priority_preempts(self):
+        started = threading.Event()
+        running = self.render.submit(self.wait_stopped, started, priority=1)
+        self.assertTrue(started.wait(5.0))
+        urgent = self.render.submit(lambda: self.stop_requested(0), priority=2)
+        self.assertTrue(running.wait(2.0))
+        self.assertTrue(running.result)
+        self.assertTrue(urgent.wait(5.0))
+        # Новая команда начинает без запроса остановки
+        self.assertFalse(urgent.result)
+
+    def test_lower_priority_waits(self):
+        started = threading.Event()
+
+        def short_wait():
+            started.set()
+            return self.stop_requested(0.2)
+
+        running = self.render.submit(short_wait, priority=5)
+        self.assertTrue(started.wait(5.0))
+        queued = self.render.submit(lambda: None, priority=1)
+        self.assertTrue(running.wait(5.0))
+        self.assertFalse(running.result)
+        self.assertTrue(queued.wait(5.0))
+
+    def test_cancel_queued_command(self):
+        command, release = self.block()
+        queued = self.render.submit(lambda: None)
+        queued.cancel()
+        self.assertTrue(queued.done.is_set())
+        release.set()
+        self.assertTrue(command.wait(5.0))
+        self.assertFalse(queued.started)
+        self.assertTrue(queued.cancelled)
+
+    def test_stop_stops_running_command(self):
+        started = threading.Event()
+        running = self.render.submit(self.wait_stopped, started)
+        self.assertTrue(started.wait(5.0))
+        self.display.stop()
+        self.assertTrue(running.wait(2.0))
+        self.assertTrue(running.result)
+
+    def test_errors_are_kept_on_the_command(self):
+        def fail():
+            raise ValueError("broken")
+
+        command = self.render.submit(fail)
+        self.assertTrue(command.wait(5.0))
+        self.assertIsInstance(command.error, ValueError)
+        self.assertTrue(self.render.submit(lambda: 1).wait(5.0))
+
+    def test_plays_animation_on_the_panels(self):
+        animation = make_animation(2, duration=10)
+        command = self.render.play([animation], [animation])
+        self.assertTrue(command.wait(5.0))
+        self.assertIsNone(command.error)
+        self.assertEqual(self.bus.panels["right"].rgb565(), animation.frames[-1])
+        self.assertEqual(self.bus.panels["left"].rgb565(), animation.frames[-1])
+
+    def test_direct_playback_after_stop(self):
+        started = threading.Event()
+        running = self.render.submit(self.wait_stopped, started)
+        self.assertTrue(started.wait(5.0))
+        self.display.stop()
+        self.assertTrue(running.wait(2.0))
+        # Остановка относилась к команде и не должна глушить следующий прямой вызов
+        animation = make_animation(2, duration=10)
+        self.display.play_animations([animation], [animation])
+        self.assertEqual(self.bus.panels["right"].rgb565(), animation.frames[-1])
+        self.assertEqual(self.bus.panels["left"].rgb565(), animation.frames[-1])
+
+    def test_direct_playback_waits_for_render_command(self):
+        queued = make_animation(2, duration=150, seed=1)
+        command = self.render.submit(self.display.play_animations, [queued], [queued])
+        time.sleep(0.05)
+        animation = make_animation(2, duration=10, seed=2)
+        self.display.play_animations([animation], [animation])
+        # Прямой вызов ждёт команду потока рендера и не прерывает её
+        self.assertTrue(command.done.is_set())
+        self.assertIsNone(command.error)
+        self.assertEqual(self.bus.panels["right"].rgb565(), animation.frames[-1])
+
+    def test_stop_reaches_direct_playback(self):
+        animation = make_animation(2, duration=5000)
+        player = threading.Thread(target=self.display.play_animations, args=([animation], [animation]))
+        start = time.monotonic()
+        player.start()
+        time.sleep(0.1)
+        self.display.stop()
+        player.join(5.0)
+        self.assertFalse(player.is_alive())
+        self.assertLess(time.monotonic() - start, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from robot_eye_display.scheduler import FrameScheduler
+
+
+class FakeClock:
+    """Clock that only moves when sleep() is called or a frame takes time to show."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FrameSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = FrameScheduler(clock=self.clock, sleep=self.clock.sleep)
+        self.dropped = []
+        self.overrun = []
+        self.scheduler.on_drop = self.dropped.append
+        self.scheduler.on_overrun = self.overrun.append
+
+    def play(self, frames, costs=None, stop=None):
+        """Play frames, each taking costs[frame] seconds to show; return (result, shown frames)."""
+        costs = costs or {}
+        shown = []
+
+        def show(frame):
+            shown.append((frame, self.clock.now))
+            self.clock.now += costs.get(frame, 0.0)
+
+        return self.scheduler.play(frames, show, stop), shown
+
+    def test_on_time(self):
+        result, shown = self.play([("a", 100), ("b", 100), ("c", 50)])
+        self.assertTrue(result)
+        self.assertEqual(shown, [("a", 0.0), ("b", 0.1), ("c", 0.2)])
+        self.assertAlmostEqual(self.clock.now, 0.25)
+        self.assertEqual((self.scheduler.frames_shown, self.scheduler.frames_dropped, self.scheduler.overruns),
+                         (3, 0, 0))
+        self.assertEqual(self.scheduler.jitter_max, 0.0)
+
+    def test_slow_frame_overruns_and_next_is_dropped(self):
+        result, shown = self.play([("a", 100), ("b", 100), ("c", 100), ("d", 100)], costs={"b": 0.25})
+        self.assertTrue(result)
+        self.assertEqual([frame for frame, _ in shown], ["a", "b", "d"])
+        self.assertEqual(self.overrun, ["b"])
+        self.assertEqual(self.dropped, ["c"])
+        self.assertEqual((self.scheduler.frames_shown, self.scheduler.frames_dropped, self.scheduler.overruns),
+                         (3, 1, 1))
+        # Расписание не сдвигается: конец последнего кадра - 0.4 с
+        self.assertAlmostEqual(self.clock.now, 0.4)
+        self.assertAlmostEqual(self.scheduler.jitter_max, 0.05)
+
+    def test_last_frame_is_never_dropped(self):
+        result, shown = self.play([(name, 100) for name in "abcde"], costs={"a": 1.0})
+        self.assertEqual([frame for frame, _ in shown], ["a", "e"])
+        self.assertEqual(self.dropped, ["b", "c", "d"])
+        self.assertEqual(self.overrun, ["a", "e"])
+
+    def test_stop(self):
+        shown = []
+
+        def stop():
+            return len(shown) >= 2
+
+        result = self.scheduler.play([(name, 100) for name in "abcd"], shown.append, stop)
+        self.assertFalse(result)
+        self.assertEqual(shown, ["a", "b"])
+
+    def test_reset_stats(self):
+        self.play([("a", 100), ("b", 100), ("c", 100)], costs={"a": 0.3})
+        self.scheduler.reset_stats()
+        self.assertEqual((self.scheduler.frames_shown, self.scheduler.frames_dropped, self.scheduler.overruns),
+                         (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
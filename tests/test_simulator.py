@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from robot_eye_display import SimulatedBus
+from robot_eye_display.RobotEyeDisplay import EqualizerLCDWindow
+
+from .support import make_display, moving_square_frames, panel_array
+
+
+class SelectRuleTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = SimulatedBus()
+        self.gpio = self.bus.gpio
+        self.gpio.setmode(self.gpio.BCM)
+
+    def selected(self, left, right):
+        self.gpio.output(7, left)
+        self.gpio.output(24, right)
+        return [panel.name for panel in self.bus.selected_panels()]
+
+    def test_single_eye(self):
+        self.assertEqual(self.selected(1, 0), ["left"])
+        self.assertEqual(self.selected(0, 1), ["right"])
+
+    def test_both_low_addresses_both_eyes(self):
+        self.assertEqual(sorted(self.selected(0, 0)), ["left", "right"])
+
+    def test_both_high_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.selected(1, 1)
+
+
+class SimulatedPanelTest(unittest.TestCase):
+    def test_init_wakes_both_panels(self):
+        bus, display = make_display()
+        for panel in bus.panels.values():
+            self.assertFalse(panel.sleeping)
+            self.assertTrue(panel.display_on)
+
+    def test_frame_reaches_only_its_eye(self):
+        bus, display = make_display()
+        frame = moving_square_frames(1)[0]
+        before = bus.panels["left"].framebuffer.copy()
+        display.right_eye(frame)
+        np.testing.assert_array_equal(bus.panels["left"].framebuffer, before)
+        np.testing.assert_array_equal(bus.panels["right"].framebuffer, panel_array(frame))
+        self.assertEqual(bus.panels["right"].rgb565(), frame)
+
+    def test_traffic_is_counted(self):
+        bus, display = make_display()
+        bus.stats.reset()
+        display.left_eye(moving_square_frames(1)[0])
+        stats = bus.stats.snapshot()
+        self.assertGreaterEqual(stats["data_bytes"], 240 * 240 * 2)
+        self.assertGreater(stats["wire_time"], 0.0)
+
+
+class BroadcastTest(unittest.TestCase):
+    def test_both_reaches_both_panels(self):
+        bus, display = make_display()
+        frame = moving_square_frames(1)[0]
+        display.show_frame("both", frame)
+        for name in ("left", "right"):
+            np.testing.assert_array_equal(bus.panels[name].framebuffer, panel_array(frame))
+
+    def test_both_leaves_select_lines_low(self):
+        bus, display = make_display()
+        display.select_eye("both")
+        self.assertEqual((bus.gpio.pins[7], bus.gpio.pins[24]), (0, 0))
+
+    def test_identical_frames_are_sent_once(self):
+        bus, display = make_display()
+        frame = moving_square_frames(1)[0]
+        bus.stats.reset()
+        display.show_eyes(frame, frame)
+        self.assertLess(bus.stats.snapshot()["data_bytes"], 2 * len(frame))
+
+    def test_partial_broadcast_matches_full(self):
+        frames = moving_square_frames()
+        panels = []
+        for partial_updates in (False, True):
+            bus, display = make_display(partial_updates=partial_updates)
+            display.right_eye(frames[0])
+            for frame in frames[1:]:
+                display.show_eyes(frame, frame)
+            panels.append([bus.panels[name].framebuffer.copy() for name in ("left", "right")])
+        for full, partial in zip(*panels):
+            np.testing.assert_array_equal(full, partial)
+
+    def test_equalizer_window_broadcasts(self):
+        bus, display = make_display()
+        window = EqualizerLCDWindow(display.disp)
+        frame = moving_square_frames(1)[0]
+        window.show_eye("both", frame)
+        for name in ("left", "right"):
+            np.testing.assert_array_equal(bus.panels[name].framebuffer, panel_array(frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
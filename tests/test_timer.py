@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from robot_eye_display.timer import DeadlineTimer
+
+
+class DeadlineTimerTest(unittest.TestCase):
+    def setUp(self):
+        self.timer = DeadlineTimer()
+
+    def call_soon(self, func, delay=0.05):
+        thread = threading.Timer(delay, func)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_wait_until_reaches_deadline(self):
+        self.assertTrue(self.timer.wait_until(self.timer.clock() + 0.02))
+        self.assertTrue(self.timer.wait_until(self.timer.clock() - 1.0))
+
+    def test_wait_times_out(self):
+        self.assertFalse(self.timer.wait(0.02))
+
+    def test_stop_interrupts_wait(self):
+        self.call_soon(self.timer.stop)
+        start = time.monotonic()
+        self.assertTrue(self.timer.wait(5.0))
+        self.assertLess(time.monotonic() - start, 2.0)
+
+    def test_stop_interrupts_wait_until(self):
+        self.call_soon(self.timer.stop)
+        self.assertFalse(self.timer.wait_until(self.timer.clock() + 5.0))
+
+    def test_stop_holds_until_reset(self):
+        self.timer.stop()
+        self.assertTrue(self.timer.is_set())
+        self.assertTrue(self.timer.wait(5.0))
+        self.assertFalse(self.timer.wait_until(self.timer.clock() + 5.0))
+        self.timer.reset()
+        self.assertFalse(self.timer.is_set())
+        self.assertFalse(self.timer.wait(0.01))
+
+    def test_stops_are_counted(self):
+        self.timer.stop()
+        self.timer.stop()
+        self.timer.reset()
+        self.assertEqual(self.timer.stops, 2)
+
+    def test_wake_cuts_wait_until_short_without_stopping(self):
+        self.call_soon(self.timer.wake)
+        start = time.monotonic()
+        self.assertFalse(self.timer.wait_until(self.timer.clock() + 5.0))
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertFalse(self.timer.is_set())
+        # Пробуждение действует один раз
+        self.assertTrue(self.timer.wait_until(self.timer.clock() + 0.02))
+
+    def test_wake_does_not_end_wait(self):
+        self.call_soon(self.timer.wake, 0.01)
+        start = time.monotonic()
+        self.assertFalse(self.timer.wait(0.1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_cpu_per_second(self):
+        now = [0.0]
+        cpu = [0.0]
+        timer = DeadlineTimer(clock=lambda: now[0], cpu_clock=lambda: cpu[0], cpu_window=5.0)
+        now[0], cpu[0] = 2.0, 0.5
+        self.assertAlmostEqual(timer.cpu_per_second(), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from robot_eye_display.pixelformat import RGB565, RGB444
+from robot_eye_display.transition import BLINK, CROSSFADE, TransitionCache, build_transition
+
+from .support import make_animation, make_display
+
+
+class BuildTransitionTest(unittest.TestCase):
+    def check_ends_on_next_frame(self, style, pixel_format, steps=8, mirror=False):
+        animation_a = make_animation(pixel_format=pixel_format, seed=1, name="a")
+        animation_b = make_animation(pixel_format=pixel_format, seed=2, name="b")
+        if mirror:
+            animation_b = animation_b.mirror()
+        transition = build_transition(animation_a, animation_b, style, steps=steps)
+        self.assertEqual(len(transition), steps)
+        self.assertEqual(transition.mirrored, animation_b.mirrored)
+        self.assertEqual(bytes(transition.frames[-1]), bytes(animation_b.frames[0]))
+
+    def test_crossfade_ends_on_next_frame(self):
+        for pixel_format in (RGB565, RGB444):
+            with self.subTest(pixel_format=pixel_format):
+                self.check_ends_on_next_frame(CROSSFADE, pixel_format)
+
+    def test_blink_ends_on_next_frame(self):
+        for pixel_format in (RGB565, RGB444):
+            for steps in (1, 2, 8, 9):
+                with self.subTest(pixel_format=pixel_format, steps=steps):
+                    self.check_ends_on_next_frame(BLINK, pixel_format, steps)
+
+    def test_mirrored_next_animation(self):
+        for style in (CROSSFADE, BLINK):
+            with self.subTest(style=style):
+                self.check_ends_on_next_frame(style, RGB565, mirror=True)
+
+    def test_blink_closes_in_the_middle(self):
+        transition = build_transition(make_animation(seed=1), make_animation(seed=2), BLINK, steps=8)
+        closed = transition.frames[3]
+        self.assertEqual(bytes(closed[:2 * 240 * 90]), bytes(2 * 240 * 90))
+
+    def test_crossfade_blends(self):
+        animation_a = make_animation(seed=1)
+        transition = build_transition(animation_a, make_animation(seed=2), CROSSFADE, steps=8)
+        self.assertNotEqual(bytes(transition.frames[0]), bytes(animation_a.frames[-1]))
+        self.assertNotEqual(bytes(transition.frames[0]), bytes(transition.frames[-1]))
+
+    def test_unknown_style(self):
+        with self.assertRaises(ValueError):
+            build_transition(make_animation(), make_animation(), "wipe")
+
+
+class PlayTransitionTest(unittest.TestCase):
+    def test_panel_waits_on_next_first_frame(self):
+        bus, display = make_display(lead_in=0, hold=0)
+        display.transitions = TransitionCache(style=BLINK, steps=4, duration=40)
+        self.addCleanup(display.transitions.close)
+        animation_a = make_animation(seed=1, duration=10)
+        animation_b = make_animation(seed=2, duration=10)
+        display.transitions.prepare(animation_a, animation_b).result(5.0)
+
+        shown = []
+        show_eyes = display.show_eyes
+
+        def record(frame_R=None, frame_L=None):
+            shown.append(frame_R)
+            show_eyes(frame_R, frame_L)
+
+        display.show_eyes = record
+        display.play_animations([animation_a, animation_b], [animation_a, animation_b])
+
+        first = bytes(animation_b.frames[0])
+        index = [bytes(frame) for frame in shown].index(first)
+        # Последний кадр перехода - это первый кадр следующей анимации
+        self.assertEqual(bytes(shown[index + 1]), first)
+        self.assertEqual(bytes(shown[-1]), bytes(animation_b.frames[-1]))